@@ -1,17 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from dataclasses import asdict
+import csv
+import gzip
+import hashlib
+import io
+import itertools
 import json
 from datetime import datetime
 import logging
 import os
+import re
+import shutil
 import threading
 import time
 import uuid
+import zlib
 import requests
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from flask_cors import CORS
+from requests.adapters import HTTPAdapter
 
-from polite_scraper import PoliteScraper
+from budget import BudgetAllocator
+from distributed import Coordinator
+from page_archive import PageArchive, replay, replay_executor
+from polite_scraper import CrawlState, PoliteScraper, extract_text
+from text_index import TextIndex
 
 app = Flask(__name__)
 CORS(app)
@@ -23,6 +37,21 @@ logging.basicConfig(
 
 URL_STORE_PATH = os.path.join(os.path.dirname(__file__), "urls_store.json")
 SCAN_SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "scan_settings.json")
+LINK_STATS_PATH = os.path.join(os.path.dirname(__file__), "link_stats.json")
+CHECKPOINT_DIR = os.getenv("CRAWL_CHECKPOINT_DIR", os.path.join(os.path.dirname(__file__), "checkpoints"))
+CHECKPOINT_MANIFEST = "scan.json"
+# When set, in-process scans archive every analyzed page for offline replay
+ARCHIVE_DIR = os.getenv("CRAWL_ARCHIVE_DIR", "")
+REPLAY_WORKERS = int(os.getenv("REPLAY_WORKERS", str(os.cpu_count() or 1)))
+# Replay process pool, started on first use and shared by all replay requests
+REPLAY_EXECUTOR = None
+REPLAY_EXECUTOR_LOCK = threading.Lock()
+# Inverted index over crawled page text; an empty path disables indexing
+SEARCH_INDEX_PATH = os.getenv("SEARCH_INDEX_PATH", os.path.join(os.path.dirname(__file__), "text_index.db"))
+SEARCH_INDEX_RETENTION_DAYS = float(os.getenv("SEARCH_INDEX_RETENTION_DAYS", "30"))
+SEARCH_DEFAULT_LIMIT = 100
+SEARCH_MAX_LIMIT = 1000
+SCAN_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
 
 DEFAULT_URLS = [
     {
@@ -35,19 +64,41 @@ DEFAULT_URLS = [
 ]
 
 URLS = []
-HEADERS = {"User-Agent": "keyword-monitor/1.0"}
+# Probes and crawls identify the same way, so the robots.txt rules checked are the ones that apply
+POLITE_USER_AGENT = "PoliteResearchBot/0.1 (+https://yourwebsite.com/contact; your.email@example.com)"
 REQUEST_TIMEOUT_SECONDS = 10
+PROBE_MAX_WORKERS = int(os.getenv("PROBE_MAX_WORKERS", "32"))
+PROBE_PER_HOST_LIMIT = int(os.getenv("PROBE_PER_HOST_LIMIT", "2"))
+PROBE_MAX_URLS = int(os.getenv("PROBE_MAX_URLS", "1000"))
+PROBE_CACHE_MAX_AGE_SECONDS = 86400
 POLITE_REQUESTS_PER_MINUTE = float(os.getenv("POLITE_REQUESTS_PER_MINUTE", "12.0"))
+# Ceiling the adaptive per-host throttle may speed up to; never below the configured rate
+POLITE_MAX_REQUESTS_PER_MINUTE = float(os.getenv("POLITE_MAX_REQUESTS_PER_MINUTE", str(POLITE_REQUESTS_PER_MINUTE)))
 POLITE_TIMEOUT_SECONDS = int(os.getenv("POLITE_TIMEOUT_SECONDS", "10"))
 POLITE_PROXIES = [p.strip() for p in os.getenv("POLITE_PROXIES", "").split(",") if p.strip()]
+POLITE_ALLOWED_CONTENT_TYPES = [
+    t.strip() for t in os.getenv("POLITE_ALLOWED_CONTENT_TYPES", "").split(",") if t.strip()
+]
+POLITE_MAX_CONTENT_BYTES = int(os.getenv("POLITE_MAX_CONTENT_BYTES", str(5 * 1024 * 1024)))
 
 POLITE_SCRAPER = PoliteScraper(
-    user_agent="PoliteResearchBot/0.1 (+https://yourwebsite.com/contact; your.email@example.com)",
+    user_agent=POLITE_USER_AGENT,
     requests_per_minute=POLITE_REQUESTS_PER_MINUTE,
+    max_requests_per_minute=POLITE_MAX_REQUESTS_PER_MINUTE,
     timeout=POLITE_TIMEOUT_SECONDS,
     proxies=POLITE_PROXIES,
+    allowed_content_types=POLITE_ALLOWED_CONTENT_TYPES or None,
+    max_content_bytes=POLITE_MAX_CONTENT_BYTES,
 )
 
+PROBE_SESSION = requests.Session()
+PROBE_SESSION.headers.update({"User-Agent": POLITE_USER_AGENT})
+PROBE_SESSION.mount("http://", HTTPAdapter(pool_connections=PROBE_MAX_WORKERS, pool_maxsize=PROBE_MAX_WORKERS))
+PROBE_SESSION.mount("https://", HTTPAdapter(pool_connections=PROBE_MAX_WORKERS, pool_maxsize=PROBE_MAX_WORKERS))
+PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS, thread_name_prefix="probe")
+PROBE_HOST_SEMAPHORES = {}
+PROBE_HOST_LOCK = threading.Lock()
+
 CRAWL_DEFAULT_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "60"))
 CRAWL_DEFAULT_TIME_LIMIT_SECONDS = float(os.getenv("CRAWL_TIME_LIMIT_SECONDS", "30"))
 CRAWL_DEFAULT_INCLUDE_SUBDOMAINS = os.getenv("CRAWL_INCLUDE_SUBDOMAINS", "true").lower() in {
@@ -56,8 +107,32 @@ CRAWL_DEFAULT_INCLUDE_SUBDOMAINS = os.getenv("CRAWL_INCLUDE_SUBDOMAINS", "true")
     "yes",
     "y",
 }
+CRAWL_DEFAULT_USE_SITEMAPS = os.getenv("CRAWL_USE_SITEMAPS", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+    "y",
+}
+CRAWL_DEFAULT_ALLOCATE_BUDGET = os.getenv("CRAWL_ALLOCATE_BUDGET", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+    "y",
+}
+# A budgeted scan hands out pages in rounds of max_pages / BUDGET_ROUNDS_PER_SITE
+BUDGET_ROUNDS_PER_SITE = 4
+BUDGET_MIN_ROUND_PAGES = 5
 CRAWL_DEFAULT_MIN_PRIORITY = int(os.getenv("CRAWL_MIN_PRIORITY", "1"))
 CRAWL_DEFAULT_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "3"))
+CRAWL_CHECKPOINT_EVERY_PAGES = int(os.getenv("CRAWL_CHECKPOINT_EVERY_PAGES", "10"))
+# With SCAN_WORKERS > 0, scans are crawled by host-partitioned worker processes
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "0"))
+SCAN_QUEUE_PATH = os.getenv("SCAN_QUEUE_PATH", os.path.join(os.path.dirname(__file__), "scan_queue.db"))
+SCAN_POLL_INTERVAL_SECONDS = 0.5
+# Slack on top of a distributed scan's summed per-site time limits
+SCAN_DEADLINE_GRACE_SECONDS = 60.0
+COORDINATOR = None
+COORDINATOR_LOCK = threading.Lock()
 
 SCAN_SETTINGS_DEFAULT = {
     "pages": {
@@ -81,11 +156,14 @@ SCAN_SETTINGS_DEFAULT = {
         "default": CRAWL_DEFAULT_MIN_PRIORITY,
     },
     "include_subdomains": CRAWL_DEFAULT_INCLUDE_SUBDOMAINS,
+    "use_sitemaps": CRAWL_DEFAULT_USE_SITEMAPS,
+    "allocate_budget": CRAWL_DEFAULT_ALLOCATE_BUDGET,
     "requests_per_minute": {
         "min": 1.0,
         "max": 60.0,
         "default": POLITE_REQUESTS_PER_MINUTE,
     },
+    "max_requests_per_minute": POLITE_MAX_REQUESTS_PER_MINUTE,
     "request_timeout_seconds": {
         "min": 3,
         "max": 45,
@@ -95,6 +173,79 @@ SCAN_SETTINGS_DEFAULT = {
 
 SCANS = {}
 SCANS_LOCK = threading.Lock()
+LINK_STATS_LOCK = threading.Lock()
+SCAN_SEQUENCE = itertools.count(1)
+
+MATCH_FIELDS = ("keyword", "url", "page_type", "site")
+
+# Serialized bodies of polled read endpoints, reused until the resource's version changes
+RESOURCE_VERSIONS = {}
+RESPONSE_CACHE = {}
+RESPONSE_CACHE_LOCK = threading.Lock()
+RESOURCE_VERSION_SEQUENCE = itertools.count(1)
+# Called with the key after every touch_resource, from whichever thread touched it
+RESOURCE_LISTENERS = []
+RESPONSE_GZIP_MIN_BYTES = 1024
+RESPONSE_GZIP_LEVEL = 6
+EXPORT_COLUMNS = ["scan_id", "seq", "startedAt", "site", "url", "keyword", "page_type"]
+EXPORT_GZIP_LEVEL = 6
+
+
+def scan_resource(scan_id):
+    return f"scan:{scan_id}"
+
+
+def touch_resource(key):
+    # Versions come from one global sequence, so a number is never reused for a key
+    with RESPONSE_CACHE_LOCK:
+        RESOURCE_VERSIONS[key] = next(RESOURCE_VERSION_SEQUENCE)
+    for listener in list(RESOURCE_LISTENERS):
+        listener(key)
+
+
+def fresh_json_body(key):
+    """Return the cached entry for key if it is still current, else None."""
+    with RESPONSE_CACHE_LOCK:
+        entry = RESPONSE_CACHE.get(key)
+        if entry is not None and entry["version"] == RESOURCE_VERSIONS.get(key, 0):
+            return entry
+    return None
+
+
+def cached_json_body(key, build_payload):
+    with RESPONSE_CACHE_LOCK:
+        version = RESOURCE_VERSIONS.get(key, 0)
+        entry = RESPONSE_CACHE.get(key)
+    if entry is None or entry["version"] != version:
+        body = json.dumps(build_payload(), separators=(",", ":")).encode("utf-8")
+        entry = {"version": version, "body": body, "etag": hashlib.sha1(body).hexdigest(), "gzip": None}
+        with RESPONSE_CACHE_LOCK:
+            RESPONSE_CACHE[key] = entry
+    return entry
+
+
+def cached_gzip_body(entry):
+    if entry["gzip"] is None:
+        entry["gzip"] = gzip.compress(entry["body"], RESPONSE_GZIP_LEVEL)
+    return entry["gzip"]
+
+
+def cached_json_response(key, build_payload):
+    entry = cached_json_body(key, build_payload)
+    use_gzip = len(entry["body"]) >= RESPONSE_GZIP_MIN_BYTES and "gzip" in request.accept_encodings
+    # Strong ETags must differ between the identity and gzip representations
+    etag = entry["etag"] + ("-gzip" if use_gzip else "")
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif use_gzip:
+        response = Response(cached_gzip_body(entry), mimetype="application/json")
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response = Response(entry["body"], mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
 
 def parse_bool(value, default=False):
@@ -152,6 +303,11 @@ def normalize_range(payload, defaults, parser):
 
 def normalize_scan_settings(payload):
     payload = payload if isinstance(payload, dict) else {}
+    requests_per_minute = normalize_range(
+        payload.get("requests_per_minute"),
+        SCAN_SETTINGS_DEFAULT["requests_per_minute"],
+        parse_float,
+    )
 
     return {
         "pages": normalize_range(payload.get("pages"), SCAN_SETTINGS_DEFAULT["pages"], parse_int),
@@ -170,10 +326,18 @@ def normalize_scan_settings(payload):
             payload.get("include_subdomains"),
             SCAN_SETTINGS_DEFAULT["include_subdomains"],
         ),
-        "requests_per_minute": normalize_range(
-            payload.get("requests_per_minute"),
-            SCAN_SETTINGS_DEFAULT["requests_per_minute"],
-            parse_float,
+        "use_sitemaps": parse_bool(
+            payload.get("use_sitemaps"),
+            SCAN_SETTINGS_DEFAULT["use_sitemaps"],
+        ),
+        "allocate_budget": parse_bool(
+            payload.get("allocate_budget"),
+            SCAN_SETTINGS_DEFAULT["allocate_budget"],
+        ),
+        "requests_per_minute": requests_per_minute,
+        "max_requests_per_minute": max(
+            parse_float(payload.get("max_requests_per_minute"), SCAN_SETTINGS_DEFAULT["max_requests_per_minute"]),
+            requests_per_minute["default"],
         ),
         "request_timeout_seconds": normalize_range(
             payload.get("request_timeout_seconds"),
@@ -204,6 +368,65 @@ def apply_scan_settings(settings):
     timeout_seconds = settings["request_timeout_seconds"]["default"]
     POLITE_SCRAPER.timeout = timeout_seconds
     POLITE_SCRAPER.request_interval = 60.0 / max(0.1, requests_per_minute)
+    POLITE_SCRAPER.min_request_interval = 60.0 / max(0.1, settings["max_requests_per_minute"])
+
+
+def load_link_stats():
+    if not os.path.exists(LINK_STATS_PATH):
+        return {}
+    try:
+        with open(LINK_STATS_PATH, "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+        if isinstance(data, dict):
+            return data
+    except Exception:
+        pass
+    return {}
+
+
+def save_link_stats(link_stats):
+    tmp_path = f"{LINK_STATS_PATH}.tmp"
+    with LINK_STATS_LOCK:
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(link_stats, handle)
+        os.replace(tmp_path, LINK_STATS_PATH)
+
+
+def scan_checkpoint_dir(scan_id):
+    return os.path.join(CHECKPOINT_DIR, scan_id)
+
+
+def save_scan_manifest(scan_id, manifest):
+    directory = scan_checkpoint_dir(scan_id)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, CHECKPOINT_MANIFEST)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_scan_manifest(scan_id):
+    path = os.path.join(scan_checkpoint_dir(scan_id), CHECKPOINT_MANIFEST)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except Exception:
+        return None
+
+
+def site_checkpoint_path(scan_id, index):
+    return os.path.join(scan_checkpoint_dir(scan_id), f"site-{index}.ckpt")
+
+
+def clear_scan_checkpoint(scan_id):
+    shutil.rmtree(scan_checkpoint_dir(scan_id), ignore_errors=True)
+
+
+def scan_archive_path(scan_id):
+    return os.path.join(ARCHIVE_DIR, f"{scan_id}.warc.gz")
+
 
 def load_urls():
     if not os.path.exists(URL_STORE_PATH):
@@ -221,44 +444,56 @@ def load_urls():
 def save_urls(urls):
     with open(URL_STORE_PATH, "w", encoding="utf-8") as handle:
         json.dump(urls, handle, indent=2)
+    touch_resource("urls")
+
+
+def get_host_semaphore(url):
+    host = urlparse(url).netloc.lower()
+    with PROBE_HOST_LOCK:
+        semaphore = PROBE_HOST_SEMAPHORES.get(host)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(PROBE_PER_HOST_LIMIT)
+            PROBE_HOST_SEMAPHORES[host] = semaphore
+    return semaphore
 
 
 def fetch_page_text(url):
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT_SECONDS)
-        response.raise_for_status()
-        return response.text, None
-    except Exception as exc:
-        return None, str(exc)
+    return POLITE_SCRAPER.fetch_probe(
+        url,
+        session=PROBE_SESSION,
+        timeout=REQUEST_TIMEOUT_SECONDS,
+        max_age_seconds=PROBE_CACHE_MAX_AGE_SECONDS,
+        slot=get_host_semaphore(url),
+    )
 
 
-def fetch_page_text_polite(url):
-    html = POLITE_SCRAPER.get(url)
-    if not html:
-        return None, "blocked by robots.txt or fetch failed"
-    return html, None
+def probe_url(url, keywords):
+    html, error = fetch_page_text(url)
+    if html is None:
+        return url, None, error or "fetch failed"
+    text = extract_text(html).lower()
+    return url, [k for k in keywords if k.lower() in text], None
 
 
 def scan_keywords(keywords, urls):
     results = {"matches": [], "errors": [], "scanned": 0}
 
+    targets = []
     for url_entry in urls:
         url = url_entry.get("url") if isinstance(url_entry, dict) else url_entry
-        if not url:
+        if url:
+            targets.append(url)
+
+    # Single pages only (no crawling): fetched concurrently over pooled
+    # connections, with at most PROBE_PER_HOST_LIMIT requests per host in flight.
+    futures = [PROBE_EXECUTOR.submit(probe_url, url, keywords) for url in targets]
+    for future in futures:
+        url, found, error = future.result()
+        if found is None:
+            results["errors"].append({"url": url, "error": error})
             continue
-        html, error = fetch_page_text(url)
-        if not html:
-            html, polite_error = fetch_page_text_polite(url)
-            if not html:
-                results["errors"].append({"url": url, "error": polite_error or error or "fetch failed"})
-                continue
-
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text().lower()
-
-        for k in keywords:
-            if k.lower() in text:
-                results["matches"].append({"keyword": k, "url": url})
+        for k in found:
+            results["matches"].append({"keyword": k, "url": url})
         results["scanned"] += 1
 
     return results
@@ -291,6 +526,250 @@ def normalize_scan_urls(payload_urls):
     return normalized
 
 
+def get_replay_executor():
+    global REPLAY_EXECUTOR
+    with REPLAY_EXECUTOR_LOCK:
+        if REPLAY_EXECUTOR is None:
+            REPLAY_EXECUTOR = replay_executor(REPLAY_WORKERS)
+        return REPLAY_EXECUTOR
+
+
+def get_coordinator():
+    global COORDINATOR
+    with COORDINATOR_LOCK:
+        if COORDINATOR is None:
+            # Workers build their own scrapers from the settings in effect when they start
+            COORDINATOR = Coordinator(
+                SCAN_QUEUE_PATH,
+                SCAN_WORKERS,
+                scraper_options={
+                    "user_agent": POLITE_SCRAPER.session.headers["User-Agent"],
+                    "requests_per_minute": 60.0 / POLITE_SCRAPER.request_interval,
+                    "max_requests_per_minute": 60.0 / POLITE_SCRAPER.min_request_interval,
+                    "timeout": POLITE_SCRAPER.timeout,
+                    "proxies": POLITE_PROXIES,
+                    "allowed_content_types": POLITE_ALLOWED_CONTENT_TYPES or None,
+                    "max_content_bytes": POLITE_MAX_CONTENT_BYTES,
+                },
+                link_stats_path=LINK_STATS_PATH,
+            )
+            COORDINATOR.start()
+            logging.info("started %s scan worker(s) on %s", SCAN_WORKERS, SCAN_QUEUE_PATH)
+        return COORDINATOR
+
+
+def submit_distributed_scan(scan_id, keywords, urls, options):
+    coordinator = get_coordinator()
+    site_urls = [entry.get("url") if isinstance(entry, dict) else entry for entry in urls]
+    site_urls = [url for url in site_urls if url]
+    # Workers checkpoint every site. The manifest lets /scan/<id>/resume finish the
+    # scan in-process: each site continues from its checkpoint, and sites that had
+    # finished return their findings from it without refetching.
+    save_scan_manifest(scan_id, {
+        "keywords": keywords,
+        "urls": site_urls,
+        "options": dict(options, trace=False, profile=False, allocate_budget=False),
+        "startedAt": datetime.utcnow().isoformat(),
+        "next_index": 1,
+        "matches": [],
+        "errors": [],
+        "stats": [],
+    })
+    deadline = None
+    if options.get("time_limit_seconds") is not None:
+        deadline = time.time() + options["time_limit_seconds"] * len(site_urls) + SCAN_DEADLINE_GRACE_SECONDS
+    coordinator.submit(
+        scan_id,
+        site_urls,
+        keywords,
+        dict(options, checkpoint_every=CRAWL_CHECKPOINT_EVERY_PAGES),
+        checkpoint_paths=[site_checkpoint_path(scan_id, index) for index in range(1, len(site_urls) + 1)],
+        deadline=deadline,
+    )
+    logging.info("scan %s queued %s url(s) for %s worker(s)", scan_id, len(site_urls), SCAN_WORKERS)
+    return coordinator
+
+
+def collect_distributed_results(coordinator, scan_id, last_id, matches, errors, stats):
+    # Folds worker results published since last_id into the scan; returns the
+    # new last_id and whether every site of the scan has finished. A finished
+    # scan's tasks and results are deleted from the queue once collected.
+    coordinator.check_workers()
+    complete = coordinator.is_complete(scan_id)
+    learned = False
+    for result in coordinator.results(scan_id, last_id):
+        last_id = result.id
+        payload = result.payload
+        if result.kind == "finding":
+            for keyword in payload["found_keywords"]:
+                matches.append((keyword, payload["url"], payload["page_type"], payload["site"]))
+        elif result.kind == "stats":
+            stats.append({
+                "url": payload["url"],
+                "pages_scanned": payload["pages_scanned"],
+                "max_depth_reached": payload["max_depth_reached"],
+                "time_elapsed": payload["time_elapsed"],
+                "leak_entities": payload["leak_entities"],
+            })
+            if payload.get("path_stats"):
+                POLITE_SCRAPER.merge_path_stats(payload["url"], payload["path_stats"])
+                learned = True
+        else:
+            logging.error("scan %s failed for url %s: %s", scan_id, payload["url"], payload["error"])
+            errors.append(payload)
+    if learned:
+        save_link_stats(POLITE_SCRAPER.snapshot_link_stats())
+    if complete:
+        coordinator.forget(scan_id)
+
+    progress = coordinator.progress(scan_id)
+    with SCANS_LOCK:
+        SCANS[scan_id]["progress"] = {
+            "current": progress["done"],
+            "total": progress["total"],
+            "url": None,
+        }
+        SCANS[scan_id]["matches"] = list(matches)
+        touch_resource(scan_resource(scan_id))
+    return last_id, complete
+
+
+def run_distributed_scan(scan_id, keywords, urls, options):
+    coordinator = submit_distributed_scan(scan_id, keywords, urls, options)
+    matches = []
+    errors = []
+    stats = []
+    last_id = 0
+    while True:
+        last_id, complete = collect_distributed_results(coordinator, scan_id, last_id, matches, errors, stats)
+        if complete:
+            break
+        time.sleep(SCAN_POLL_INTERVAL_SECONDS)
+
+    return matches, errors, stats
+
+
+def run_budgeted_scan(scan_id, keywords, urls, options, archive=None):
+    # The page and time budgets of all sites are pooled and handed out a round
+    # at a time, so sites that keep producing findings get more of them.
+    sites = {}
+    for index, url_entry in enumerate(urls, start=1):
+        url = url_entry.get("url") if isinstance(url_entry, dict) else url_entry
+        if url:
+            sites[index] = url
+
+    max_pages = options["max_pages"]
+    time_limit_seconds = options["time_limit_seconds"]
+    allocator = BudgetAllocator(
+        sites,
+        total_pages=max_pages * len(sites),
+        round_pages=max(BUDGET_MIN_ROUND_PAGES, max_pages // BUDGET_ROUNDS_PER_SITE),
+    )
+    time_budget = time_limit_seconds * len(sites) if time_limit_seconds is not None else None
+    states = {}
+    errors = []
+    traces = []
+
+    # Sites checkpointed before a restart rejoin the allocation where they stopped
+    for index in sites:
+        checkpoint_path = site_checkpoint_path(scan_id, index)
+        if os.path.exists(checkpoint_path):
+            state = CrawlState.load(checkpoint_path)
+            states[index] = state
+            allocator.observe(index, state.pages_scanned, state.findings, exhausted=state.seeded and not state.queue)
+
+    while True:
+        time_used = sum(state.elapsed for state in states.values())
+        if time_budget is not None and time_used >= time_budget:
+            break
+        index = allocator.next_site()
+        if index is None:
+            break
+
+        url = sites[index]
+        state = states.get(index) or POLITE_SCRAPER.new_crawl_state(url, keywords)
+        states[index] = state
+        visited_before = len(state.visited)
+        round_pages = allocator.next_round_pages()
+
+        with SCANS_LOCK:
+            SCANS[scan_id]["progress"] = {
+                "current": allocator.pages_used,
+                "total": allocator.total_pages,
+                "url": url,
+            }
+            touch_resource(scan_resource(scan_id))
+        logging.info(
+            "scan %s budget round: %s page(s) for %s (%s/%s used)",
+            scan_id,
+            round_pages,
+            url,
+            allocator.pages_used,
+            allocator.total_pages,
+        )
+
+        try:
+            report = POLITE_SCRAPER.crawl(
+                url,
+                keywords,
+                max_pages=state.pages_scanned + round_pages,
+                min_priority_to_expand=options["min_priority_to_expand"],
+                include_subdomains=options["include_subdomains"],
+                time_limit_seconds=state.elapsed + time_budget - time_used if time_budget is not None else None,
+                max_depth=options["max_depth"],
+                allow_low_value_urls=True,
+                trace=options["trace"],
+                profile=options["profile"],
+                use_sitemaps=options["use_sitemaps"],
+                state=state,
+                checkpoint_path=site_checkpoint_path(scan_id, index),
+                checkpoint_every=CRAWL_CHECKPOINT_EVERY_PAGES,
+                archive=archive,
+                text_index=TEXT_INDEX,
+                index_scan_id=scan_id,
+            )
+        except Exception as exc:
+            logging.error("scan %s failed for url %s: %s", scan_id, url, exc)
+            errors.append({"url": url, "error": str(exc)})
+            allocator.observe(index, max(1, state.pages_scanned), state.findings, exhausted=True)
+            continue
+
+        save_link_stats(POLITE_SCRAPER.snapshot_link_stats())
+        # A failed seed, an empty frontier or a round that visited nothing new
+        # means more pages would not help this site.
+        exhausted = not state.seeded or not state.queue or len(state.visited) == visited_before
+        allocator.observe(index, report.pages_scanned, state.findings, exhausted)
+
+        if options["trace"]:
+            traces.append({
+                "url": url,
+                "pages": [asdict(page) for page in report.trace],
+                "profile": report.profile,
+            })
+            with SCANS_LOCK:
+                SCANS[scan_id]["trace"] = list(traces)
+                touch_resource(scan_resource(scan_id))
+
+    matches = []
+    stats = []
+    for index, url in sites.items():
+        state = states.get(index)
+        if state is None:
+            stats.append({"url": url, "pages_scanned": 0, "max_depth_reached": 0, "time_elapsed": 0.0})
+            continue
+        for finding in state.findings:
+            for keyword in finding.found_keywords:
+                matches.append((keyword, finding.url, finding.page_type, url))
+        stats.append({
+            "url": url,
+            "pages_scanned": allocator.arms[index].pages,
+            "max_depth_reached": state.max_depth_reached,
+            "time_elapsed": max(0.01, state.elapsed),
+            "leak_entities": state.entities.summary(),
+        })
+    return matches, errors, stats
+
+
 def run_scan(
     scan_id,
     keywords,
@@ -300,14 +779,74 @@ def run_scan(
     include_subdomains,
     time_limit_seconds,
     max_depth,
+    trace=False,
+    profile=False,
+    use_sitemaps=False,
+    allocate_budget=False,
+    resume=None,
 ):
-    logging.info("scan %s started with %s url(s)", scan_id, len(urls))
+    # Worker processes don't return page traces or profiles, so those scans stay in-process
+    if SCAN_WORKERS > 0 and not resume and not allocate_budget and not trace and not profile:
+        matches, errors, stats = run_distributed_scan(scan_id, keywords, urls, {
+            "max_pages": max_pages,
+            "min_priority_to_expand": min_priority_to_expand,
+            "include_subdomains": include_subdomains,
+            "time_limit_seconds": time_limit_seconds,
+            "max_depth": max_depth,
+            "use_sitemaps": use_sitemaps,
+        })
+        complete_scan(scan_id, matches, errors, stats)
+        return
+
     total = len(urls)
-    matches = []
-    errors = []
-    stats = []
+    traces = []
+    archive = None
+    if ARCHIVE_DIR:
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        archive = PageArchive(scan_archive_path(scan_id))
+    # The manifest records the scan's inputs and the results of finished sites;
+    # the site in progress is checkpointed separately by the crawler.
+    if resume:
+        manifest = resume
+        matches = [tuple(match) for match in manifest["matches"]]
+        errors = manifest["errors"]
+        stats = manifest["stats"]
+        logging.info("scan %s resumed at url %s/%s", scan_id, manifest["next_index"], total)
+    else:
+        matches = []
+        errors = []
+        stats = []
+        manifest = {
+            "keywords": keywords,
+            "urls": urls,
+            "options": {
+                "max_pages": max_pages,
+                "min_priority_to_expand": min_priority_to_expand,
+                "include_subdomains": include_subdomains,
+                "time_limit_seconds": time_limit_seconds,
+                "max_depth": max_depth,
+                "trace": trace,
+                "profile": profile,
+                "use_sitemaps": use_sitemaps,
+                "allocate_budget": allocate_budget,
+            },
+            "startedAt": datetime.utcnow().isoformat(),
+            "next_index": 1,
+            "matches": matches,
+            "errors": errors,
+            "stats": stats,
+        }
+        save_scan_manifest(scan_id, manifest)
+        logging.info("scan %s started with %s url(s)", scan_id, len(urls))
+
+    if allocate_budget:
+        matches, errors, stats = run_budgeted_scan(scan_id, keywords, urls, manifest["options"], archive)
+        complete_scan(scan_id, matches, errors, stats)
+        return
 
     for index, url_entry in enumerate(urls, start=1):
+        if index < manifest["next_index"]:
+            continue
         url = url_entry.get("url") if isinstance(url_entry, dict) else url_entry
         if not url:
             continue
@@ -318,6 +857,7 @@ def run_scan(
                 "total": total,
                 "url": url,
             }
+            touch_resource(scan_resource(scan_id))
 
         logging.info("scan %s progress %s/%s: %s", scan_id, index, total, url)
 
@@ -331,19 +871,42 @@ def run_scan(
                 time_limit_seconds=time_limit_seconds,
                 max_depth=max_depth,
                 allow_low_value_urls=True,
+                trace=trace,
+                profile=profile,
+                use_sitemaps=use_sitemaps,
+                checkpoint_path=site_checkpoint_path(scan_id, index),
+                checkpoint_every=CRAWL_CHECKPOINT_EVERY_PAGES,
+                archive=archive,
+                text_index=TEXT_INDEX,
+                index_scan_id=scan_id,
             )
 
             for finding in report.findings:
+                # Stored as MATCH_FIELDS tuples sharing the finding's strings;
+                # expanded to dicts only when a scan is serialized.
                 for keyword in finding.found_keywords:
-                    matches.append({"keyword": keyword, "url": finding.url})
+                    matches.append((keyword, finding.url, finding.page_type, url))
             
+            save_link_stats(POLITE_SCRAPER.snapshot_link_stats())
+
             # Always append stats, even if pages_scanned is low
             stats.append({
                 "url": url,
                 "pages_scanned": report.pages_scanned,
                 "max_depth_reached": report.max_depth_reached,
                 "time_elapsed": report.time_elapsed,
+                "leak_entities": report.leak_entities,
             })
+
+            if trace:
+                traces.append({
+                    "url": url,
+                    "pages": [asdict(page) for page in report.trace],
+                    "profile": report.profile,
+                })
+                with SCANS_LOCK:
+                    SCANS[scan_id]["trace"] = list(traces)
+                    touch_resource(scan_resource(scan_id))
         except Exception as exc:
             logging.error("scan %s failed for url %s: %s", scan_id, url, exc)
             errors.append({"url": url, "error": str(exc)})
@@ -355,8 +918,29 @@ def run_scan(
                 "time_elapsed": 0.01,
             })
 
+        manifest["next_index"] = index + 1
+        manifest["matches"] = matches
+        save_scan_manifest(scan_id, manifest)
+        try:
+            os.remove(site_checkpoint_path(scan_id, index))
+        except OSError:
+            pass
+
         time.sleep(0.1)
 
+    complete_scan(scan_id, matches, errors, stats)
+
+
+def complete_scan(scan_id, matches, errors, stats):
+    clear_scan_checkpoint(scan_id)
+    if TEXT_INDEX is not None:
+        removed = TEXT_INDEX.compact(SEARCH_INDEX_RETENTION_DAYS * 86400)
+        if removed:
+            logging.info("search index compacted: %s expired page(s) removed", removed)
+    finish_scan(scan_id, matches, errors, stats)
+
+
+def finish_scan(scan_id, matches, errors, stats):
     status = "complete"
     with SCANS_LOCK:
         SCANS[scan_id]["status"] = status
@@ -364,6 +948,7 @@ def run_scan(
         SCANS[scan_id]["errors"] = errors
         SCANS[scan_id]["stats"] = stats
         SCANS[scan_id]["completedAt"] = datetime.utcnow().isoformat()
+        touch_resource(scan_resource(scan_id))
 
     logging.info(
         "scan %s finished: %s match(es), %s error(s)",
@@ -373,9 +958,8 @@ def run_scan(
     )
 
 
-@app.route("/scan", methods=["POST"])
-def scan():
-    data = request.json or {}
+def parse_scan_request(data):
+    # Returns (keywords, urls, run_scan keyword options) for a /scan payload
     user_input = data.get("keywords", "")
     keywords = [k.strip() for k in user_input.split(",") if k.strip()]
 
@@ -400,6 +984,16 @@ def scan():
         settings["include_subdomains"],
     )
 
+    use_sitemaps = parse_bool(
+        data.get("use_sitemaps"),
+        settings["use_sitemaps"],
+    )
+
+    allocate_budget = parse_bool(
+        data.get("allocate_budget"),
+        settings["allocate_budget"],
+    )
+
     priority_range = settings["min_priority_to_expand"]
     min_priority_to_expand = clamp(
         parse_int(data.get("min_priority_to_expand"), priority_range["default"]),
@@ -414,58 +1008,347 @@ def scan():
         depth_range["max"],
     )
 
+    # Profiling the analysis stage only makes sense alongside the page trace.
+    profile = parse_bool(data.get("profile"), False)
+    trace = parse_bool(data.get("trace"), False) or profile
+
     urls_payload = data.get("urls")
     urls_to_scan = normalize_scan_urls(urls_payload)
     if not urls_to_scan:
         urls_to_scan = get_enabled_urls()
 
-    if not urls_to_scan:
-        return jsonify({"error": "no valid urls to scan"}), 400
+    options = {
+        "max_pages": max_pages,
+        "min_priority_to_expand": min_priority_to_expand,
+        "include_subdomains": include_subdomains,
+        "time_limit_seconds": time_limit_seconds,
+        "max_depth": max_depth,
+        "trace": trace,
+        "profile": profile,
+        "use_sitemaps": use_sitemaps,
+        "allocate_budget": allocate_budget,
+    }
+    return keywords, urls_to_scan, options
 
+
+def create_scan_entry(total, trace=False):
     scan_id = uuid.uuid4().hex
     with SCANS_LOCK:
+        seq = next(SCAN_SEQUENCE)
         SCANS[scan_id] = {
+            "seq": seq,
             "status": "scanning",
             "matches": [],
             "errors": [],
-            "progress": {"current": 0, "total": len(urls_to_scan), "url": None},
+            "progress": {"current": 0, "total": total, "url": None},
             "startedAt": datetime.utcnow().isoformat(),
         }
+        if trace:
+            SCANS[scan_id]["trace"] = []
+        touch_resource(scan_resource(scan_id))
+    return scan_id, seq
+
 
+@app.route("/scan", methods=["POST"])
+def scan():
+    data = request.json or {}
+    keywords, urls_to_scan, options = parse_scan_request(data)
+    if not urls_to_scan:
+        return jsonify({"error": "no valid urls to scan"}), 400
+
+    scan_id, seq = create_scan_entry(len(urls_to_scan), options["trace"])
     worker = threading.Thread(
         target=run_scan,
-        args=(
-            scan_id,
-            keywords,
-            urls_to_scan,
-            max_pages,
-            min_priority_to_expand,
-            include_subdomains,
-            time_limit_seconds,
-            max_depth,
-        ),
+        args=(scan_id, keywords, urls_to_scan),
+        kwargs=options,
         daemon=True,
     )
     worker.start()
 
     logging.info("scan %s queued", scan_id)
-    return jsonify({"status": "scanning", "scan_id": scan_id})
+    return jsonify({"status": "scanning", "scan_id": scan_id, "seq": seq})
+
+
+@app.route("/scan/<scan_id>/resume", methods=["POST"])
+def resume_scan(scan_id):
+    if not SCAN_ID_PATTERN.match(scan_id):
+        return jsonify({"error": "invalid scan id"}), 400
+
+    with SCANS_LOCK:
+        running = SCANS.get(scan_id, {}).get("status") == "scanning"
+    if running:
+        return jsonify({"error": "scan is already running"}), 409
+
+    manifest = load_scan_manifest(scan_id)
+    if not manifest:
+        return jsonify({"error": "no checkpoint for scan"}), 404
+
+    urls_to_scan = manifest["urls"]
+    options = manifest["options"]
+    if SCAN_WORKERS > 0:
+        # Tasks a previous run left in the worker queue would crawl the sites a second time
+        get_coordinator().forget(scan_id)
+    with SCANS_LOCK:
+        seq = next(SCAN_SEQUENCE)
+        SCANS[scan_id] = {
+            "seq": seq,
+            "status": "scanning",
+            "matches": [],
+            "errors": [],
+            "progress": {"current": manifest["next_index"] - 1, "total": len(urls_to_scan), "url": None},
+            "startedAt": manifest.get("startedAt"),
+            "resumedAt": datetime.utcnow().isoformat(),
+        }
+        if options.get("trace"):
+            SCANS[scan_id]["trace"] = []
+        touch_resource(scan_resource(scan_id))
+
+    worker = threading.Thread(
+        target=run_scan,
+        args=(scan_id, manifest["keywords"], urls_to_scan),
+        kwargs=dict(options, resume=manifest),
+        daemon=True,
+    )
+    worker.start()
+
+    logging.info("scan %s resume queued", scan_id)
+    return jsonify({"status": "scanning", "scan_id": scan_id, "seq": seq})
+
+
+@app.route("/scan/<scan_id>/replay", methods=["POST"])
+def replay_scan(scan_id):
+    if not SCAN_ID_PATTERN.match(scan_id):
+        return jsonify({"error": "invalid scan id"}), 400
+    if not ARCHIVE_DIR or not os.path.exists(scan_archive_path(scan_id)):
+        return jsonify({"error": "no archive for scan"}), 404
+
+    data = request.json or {}
+    keywords = [k.strip() for k in data.get("keywords", "").split(",") if k.strip()]
+    if not keywords:
+        return jsonify({"error": "keywords are required"}), 400
+
+    started = time.time()
+    matches = []
+    hits = replay(scan_archive_path(scan_id), keywords, workers=REPLAY_WORKERS, executor=get_replay_executor())
+    for site, finding in hits:
+        for keyword in finding.found_keywords:
+            matches.append((keyword, finding.url, finding.page_type, site))
+    logging.info(
+        "scan %s replayed with %s keyword(s): %s match(es) in %.2fs",
+        scan_id,
+        len(keywords),
+        len(matches),
+        time.time() - started,
+    )
+    return jsonify({
+        "scan_id": scan_id,
+        "keywords": keywords,
+        "matches": [dict(zip(MATCH_FIELDS, match)) for match in matches],
+    })
+
+
+@app.route("/api/search", methods=["GET"])
+def search_index():
+    if TEXT_INDEX is None:
+        return jsonify({"error": "search index is disabled"}), 404
+
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    scan_id = request.args.get("scan_id") or None
+    since_days = parse_float(request.args.get("since_days"), None)
+    limit = clamp(parse_int(request.args.get("limit"), SEARCH_DEFAULT_LIMIT), 1, SEARCH_MAX_LIMIT)
+
+    started = time.perf_counter()
+    matches = TEXT_INDEX.search(
+        query,
+        scan_id=scan_id,
+        since=time.time() - since_days * 86400 if since_days is not None else None,
+        limit=limit,
+    )
+    for match in matches:
+        match["indexedAt"] = datetime.utcfromtimestamp(match.pop("indexed_at")).isoformat()
+    return jsonify({
+        "query": query,
+        "matches": matches,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+@app.route("/api/checkpoints", methods=["GET"])
+def list_checkpoints():
+    checkpoints = []
+    if os.path.isdir(CHECKPOINT_DIR):
+        for scan_id in sorted(os.listdir(CHECKPOINT_DIR)):
+            if not SCAN_ID_PATTERN.match(scan_id):
+                continue
+            manifest = load_scan_manifest(scan_id)
+            if not manifest:
+                continue
+            with SCANS_LOCK:
+                status = SCANS.get(scan_id, {}).get("status")
+            checkpoints.append({
+                "scan_id": scan_id,
+                "startedAt": manifest.get("startedAt"),
+                "next_index": manifest["next_index"],
+                "total": len(manifest["urls"]),
+                "running": status == "scanning",
+            })
+    return jsonify({"checkpoints": checkpoints})
+
+
+def serialize_scan(scan):
+    payload = dict(scan)
+    payload["matches"] = [dict(zip(MATCH_FIELDS, match)) for match in scan.get("matches", [])]
+    return payload
+
+
+@app.route("/api/probe", methods=["POST"])
+def probe():
+    data = request.json or {}
+    user_input = data.get("keywords", "")
+    if isinstance(user_input, list):
+        keywords = [str(k).strip() for k in user_input if str(k).strip()]
+    else:
+        keywords = [k.strip() for k in str(user_input).split(",") if k.strip()]
+    if not keywords:
+        return jsonify({"error": "keywords are required"}), 400
+
+    urls_to_probe = normalize_scan_urls(data.get("urls"))
+    if not urls_to_probe:
+        urls_to_probe = get_enabled_urls()
+    if not urls_to_probe:
+        return jsonify({"error": "no valid urls to probe"}), 400
+    if len(urls_to_probe) > PROBE_MAX_URLS:
+        return jsonify({"error": f"at most {PROBE_MAX_URLS} urls per probe"}), 400
+
+    started = time.time()
+    results = scan_keywords(keywords, urls_to_probe)
+    results["time_elapsed"] = time.time() - started
+    logging.info(
+        "probe checked %s url(s) in %.2fs: %s match(es), %s error(s)",
+        len(urls_to_probe),
+        results["time_elapsed"],
+        len(results["matches"]),
+        len(results["errors"]),
+    )
+    return jsonify(results)
 
 
 @app.route("/scan-status/<scan_id>", methods=["GET"])
 def scan_status(scan_id):
     with SCANS_LOCK:
-        scan = SCANS.get(scan_id)
-    if not scan:
+        found = scan_id in SCANS
+    if not found:
         return jsonify({"error": "scan not found"}), 404
-    return jsonify(scan)
+
+    def build_payload():
+        with SCANS_LOCK:
+            return serialize_scan(SCANS[scan_id])
+
+    return cached_json_response(scan_resource(scan_id), build_payload)
+
+
+def iter_export_rows(scan_ids=None, min_seq=None, max_seq=None, keyword=None, page_type=None):
+    # Only the scan references are snapshotted; rows are produced one at a time
+    # so memory stays flat regardless of how many matches are exported.
+    with SCANS_LOCK:
+        selected = sorted(
+            (scan.get("seq", 0), scan_id, scan)
+            for scan_id, scan in SCANS.items()
+            if (scan_ids is None or scan_id in scan_ids)
+            and (min_seq is None or scan.get("seq", 0) >= min_seq)
+            and (max_seq is None or scan.get("seq", 0) <= max_seq)
+        )
+
+    keyword = keyword.lower() if keyword else None
+    for seq, scan_id, scan in selected:
+        with SCANS_LOCK:
+            matches = scan.get("matches", [])
+            started_at = scan.get("startedAt")
+        for match_keyword, match_url, match_page_type, match_site in matches:
+            if keyword and match_keyword.lower() != keyword:
+                continue
+            if page_type and match_page_type != page_type:
+                continue
+            yield {
+                "scan_id": scan_id,
+                "seq": seq,
+                "startedAt": started_at,
+                "site": match_site,
+                "url": match_url,
+                "keyword": match_keyword,
+                "page_type": match_page_type,
+            }
+
+
+def encode_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow([row.get(column) for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+
+
+def gzip_stream(chunks):
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@app.route("/api/export", methods=["GET"])
+def export_results():
+    export_format = (request.args.get("format") or "ndjson").lower()
+    if export_format not in {"ndjson", "csv"}:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    scan_ids = request.args.get("scan_id")
+    rows = iter_export_rows(
+        scan_ids={s.strip() for s in scan_ids.split(",") if s.strip()} if scan_ids else None,
+        min_seq=parse_int(request.args.get("from_seq"), None),
+        max_seq=parse_int(request.args.get("to_seq"), None),
+        keyword=(request.args.get("keyword") or "").strip() or None,
+        page_type=(request.args.get("page_type") or "").strip() or None,
+    )
+
+    if export_format == "csv":
+        chunks = encode_csv(rows)
+        mimetype = "text/csv"
+    else:
+        chunks = encode_ndjson(rows)
+        mimetype = "application/x-ndjson"
+    filename = f"scan_results.{export_format}"
+
+    if parse_bool(request.args.get("gzip"), False):
+        chunks = gzip_stream(chunks)
+        mimetype = "application/gzip"
+        filename += ".gz"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @app.route("/api/urls", methods=["GET"])
 def get_urls():
     if not URLS:
         URLS.extend(load_urls())
-    return jsonify({
+        touch_resource("urls")
+    return cached_json_response("urls", lambda: {
         "urls": URLS,
         "total": len(URLS),
         "enabled": len([u for u in URLS if u.get("status") == "enabled"]),
@@ -534,7 +1417,7 @@ def toggle_url(url_id):
 
 @app.route("/api/scan-settings", methods=["GET"])
 def get_scan_settings():
-    return jsonify({"settings": SCAN_SETTINGS})
+    return cached_json_response("scan-settings", lambda: {"settings": SCAN_SETTINGS})
 
 
 @app.route("/api/scan-settings", methods=["PUT"])
@@ -545,10 +1428,13 @@ def update_scan_settings():
     SCAN_SETTINGS = updated
     save_scan_settings(SCAN_SETTINGS)
     apply_scan_settings(SCAN_SETTINGS)
+    touch_resource("scan-settings")
     return jsonify({"settings": SCAN_SETTINGS})
 
 
 URLS = load_urls()
+TEXT_INDEX = TextIndex(SEARCH_INDEX_PATH) if SEARCH_INDEX_PATH else None
+POLITE_SCRAPER.link_stats = load_link_stats()
 SCAN_SETTINGS = load_scan_settings()
 apply_scan_settings(SCAN_SETTINGS)
 
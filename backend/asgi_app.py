@@ -0,0 +1,412 @@
+import asyncio
+import contextvars
+import io
+import json
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import app as backend
+
+# Hot routes are served on the event loop; everything else goes through the
+# Flask app on a small bridge pool. With SCAN_WORKERS > 0 crawls run in the
+# coordinator's worker processes, otherwise on the crawl pool like under Flask.
+ASGI_BRIDGE_THREADS = int(os.getenv("ASGI_BRIDGE_THREADS", "8"))
+ASGI_CRAWL_THREADS = int(os.getenv("ASGI_CRAWL_THREADS", "4"))
+STATUS_MAX_WAIT_SECONDS = 30.0
+SCAN_STATUS_PATTERN = re.compile(r"^/scan-status/([^/]+)$")
+# Options the worker processes' crawl() understands; tracing stays in-process
+DISTRIBUTED_OPTION_NAMES = (
+    "max_pages",
+    "min_priority_to_expand",
+    "include_subdomains",
+    "time_limit_seconds",
+    "max_depth",
+    "use_sitemaps",
+)
+
+BRIDGE_EXECUTOR = ThreadPoolExecutor(max_workers=ASGI_BRIDGE_THREADS, thread_name_prefix="wsgi-bridge")
+# In-process scans: budgeted and traced ones, and all scans without workers
+CRAWL_EXECUTOR = ThreadPoolExecutor(max_workers=ASGI_CRAWL_THREADS, thread_name_prefix="crawl")
+SCAN_TASKS = set()
+# Events of the long polls waiting on a resource, by key. Only touched on the
+# event loop thread; touch_resource reaches it through call_soon_threadsafe.
+RESOURCE_WAITERS = {}
+RESOURCE_LISTENER = None
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AsgiRequest:
+    def __init__(self, scope, body):
+        self.scope = scope
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        self.body = body
+
+    def arg(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def json(self):
+        # Same contract as Flask's request.json: 415 unless the body is declared
+        # JSON, 400 if it doesn't parse.
+        mimetype = self.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if mimetype != "application/json" and not (mimetype.startswith("application/") and mimetype.endswith("+json")):
+            raise RequestError(415, "request body must be application/json")
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise RequestError(400, "request body is not valid JSON")
+        return data if isinstance(data, dict) else {}
+
+    def accepts_gzip(self):
+        for coding in self.headers.get("accept-encoding", "").split(","):
+            name, _, params = coding.strip().partition(";")
+            if name.strip().lower() in {"gzip", "*"}:
+                return params.replace(" ", "") not in {"q=0", "q=0.0", "q=0.00", "q=0.000"}
+        return False
+
+    def if_none_match(self):
+        header = self.headers.get("if-none-match", "")
+        if header.strip() == "*":
+            return {"*"}
+        tags = set()
+        for tag in header.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag:
+                tags.add(tag.strip('"'))
+        return tags
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def send_response(send, status, body=b"", headers=None):
+    response_headers = [
+        (b"access-control-allow-origin", b"*"),
+        (b"access-control-expose-headers", b"ETag"),
+    ]
+    for name, value in (headers or {}).items():
+        response_headers.append((name.lower().encode("latin-1"), str(value).encode("latin-1")))
+    response_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+    await send({"type": "http.response.start", "status": status, "headers": response_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    await send_response(send, status, body, {"content-type": "application/json"})
+
+
+def negotiate_cached(req, entry):
+    use_gzip = len(entry["body"]) >= backend.RESPONSE_GZIP_MIN_BYTES and req.accepts_gzip()
+    etag = entry["etag"] + ("-gzip" if use_gzip else "")
+    return etag, use_gzip
+
+
+async def cached_body(key, build_payload):
+    # Serving a current entry is a dict lookup; rebuilding one means a json.dumps
+    # of the whole payload, so that runs on the bridge pool.
+    entry = backend.fresh_json_body(key)
+    if entry is None:
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(BRIDGE_EXECUTOR, backend.cached_json_body, key, build_payload)
+    return entry
+
+
+def wake_resource(key):
+    for event in RESOURCE_WAITERS.pop(key, ()):
+        event.set()
+
+
+def watch_resource(key):
+    global RESOURCE_LISTENER
+    if RESOURCE_LISTENER is None:
+        loop = asyncio.get_running_loop()
+
+        def listener(changed):
+            if changed in RESOURCE_WAITERS:
+                loop.call_soon_threadsafe(wake_resource, changed)
+
+        RESOURCE_LISTENER = listener
+        backend.RESOURCE_LISTENERS.append(listener)
+    event = asyncio.Event()
+    RESOURCE_WAITERS.setdefault(key, set()).add(event)
+    return event
+
+
+def unwatch_resource(key, event):
+    waiters = RESOURCE_WAITERS.get(key)
+    if waiters is not None:
+        waiters.discard(event)
+        if not waiters:
+            del RESOURCE_WAITERS[key]
+
+
+async def send_cached(send, req, entry):
+    etag, use_gzip = negotiate_cached(req, entry)
+    headers = {
+        "etag": f'"{etag}"',
+        "vary": "Accept-Encoding",
+        "cache-control": "no-cache",
+    }
+    matches = req.if_none_match()
+    if etag in matches or "*" in matches:
+        await send_response(send, 304, b"", headers)
+        return
+    headers["content-type"] = "application/json"
+    if use_gzip:
+        headers["content-encoding"] = "gzip"
+        body = entry["gzip"]
+        if body is None:
+            body = await asyncio.get_running_loop().run_in_executor(BRIDGE_EXECUTOR, backend.cached_gzip_body, entry)
+        await send_response(send, 200, body, headers)
+    else:
+        await send_response(send, 200, entry["body"], headers)
+
+
+def urls_payload():
+    urls = backend.URLS
+    return {
+        "urls": urls,
+        "total": len(urls),
+        "enabled": len([u for u in urls if u.get("status") == "enabled"]),
+    }
+
+
+async def get_urls(req, send):
+    if not backend.URLS:
+        # Same lazy reload as the Flask route, but off the event loop
+        return await call_wsgi(req, send)
+    entry = await cached_body("urls", urls_payload)
+    await send_cached(send, req, entry)
+
+
+async def get_scan_settings(req, send):
+    entry = await cached_body("scan-settings", lambda: {"settings": backend.SCAN_SETTINGS})
+    await send_cached(send, req, entry)
+
+
+async def scan_status_entry(scan_id):
+    with backend.SCANS_LOCK:
+        if scan_id not in backend.SCANS:
+            return None
+
+    def build_payload():
+        with backend.SCANS_LOCK:
+            return backend.serialize_scan(backend.SCANS[scan_id])
+
+    return await cached_body(backend.scan_resource(scan_id), build_payload)
+
+
+async def get_scan_status(req, send, scan_id):
+    entry = await scan_status_entry(scan_id)
+    if entry is None:
+        return await send_json(send, {"error": "scan not found"}, 404)
+
+    # Long poll: with ?wait=N and a current ETag, hold the connection until the
+    # scan changes or N seconds pass instead of making the client re-poll.
+    wait = backend.clamp(backend.parse_float(req.arg("wait"), 0.0), 0.0, STATUS_MAX_WAIT_SECONDS)
+    if wait > 0 and negotiate_cached(req, entry)[0] in req.if_none_match():
+        key = backend.scan_resource(scan_id)
+        # Register before re-checking the version so a touch in between still wakes us
+        event = watch_resource(key)
+        try:
+            if backend.RESOURCE_VERSIONS.get(key, 0) == entry["version"]:
+                await asyncio.wait_for(event.wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            unwatch_resource(key, event)
+        if backend.RESOURCE_VERSIONS.get(key, 0) != entry["version"]:
+            entry = await scan_status_entry(scan_id)
+            if entry is None:
+                return await send_json(send, {"error": "scan not found"}, 404)
+    await send_cached(send, req, entry)
+
+
+async def post_scan(req, send):
+    try:
+        data = req.json()
+    except RequestError as exc:
+        return await send_json(send, {"error": str(exc)}, exc.status)
+    keywords, urls_to_scan, options = backend.parse_scan_request(data)
+    if not urls_to_scan:
+        return await send_json(send, {"error": "no valid urls to scan"}, 400)
+
+    scan_id, seq = backend.create_scan_entry(len(urls_to_scan), options["trace"])
+    loop = asyncio.get_running_loop()
+    if backend.SCAN_WORKERS <= 0 or options["allocate_budget"] or options["trace"]:
+        task = loop.run_in_executor(
+            CRAWL_EXECUTOR,
+            lambda: backend.run_scan(scan_id, keywords, urls_to_scan, **options),
+        )
+    else:
+        task = asyncio.ensure_future(run_distributed_scan(scan_id, keywords, urls_to_scan, options))
+    SCAN_TASKS.add(task)
+    task.add_done_callback(SCAN_TASKS.discard)
+
+    logging.info("scan %s queued", scan_id)
+    await send_json(send, {"status": "scanning", "scan_id": scan_id, "seq": seq})
+
+
+async def run_distributed_scan(scan_id, keywords, urls, options):
+    loop = asyncio.get_running_loop()
+    crawl_options = {name: options[name] for name in DISTRIBUTED_OPTION_NAMES}
+    try:
+        coordinator = await loop.run_in_executor(
+            BRIDGE_EXECUTOR, backend.submit_distributed_scan, scan_id, keywords, urls, crawl_options
+        )
+        matches = []
+        errors = []
+        stats = []
+        last_id = 0
+        while True:
+            last_id, complete = await loop.run_in_executor(
+                BRIDGE_EXECUTOR,
+                backend.collect_distributed_results,
+                coordinator,
+                scan_id,
+                last_id,
+                matches,
+                errors,
+                stats,
+            )
+            if complete:
+                break
+            await asyncio.sleep(backend.SCAN_POLL_INTERVAL_SECONDS)
+    except Exception as exc:
+        logging.error("scan %s failed: %s", scan_id, exc)
+        backend.finish_scan(scan_id, [], [{"url": None, "error": str(exc)}], [])
+        return
+    await loop.run_in_executor(BRIDGE_EXECUTOR, backend.complete_scan, scan_id, matches, errors, stats)
+
+
+def wsgi_environ(req):
+    scope = req.scope
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": req.method,
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": req.path,
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "CONTENT_LENGTH": str(len(req.body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(req.body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in req.headers.items():
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name != "content-length":
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_wsgi(req, send):
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+
+    # Flask keeps the request context in ContextVars, and stream_with_context pops
+    # it from inside the body iterator, so the app call and every next() must run
+    # in one Context even though they land on different pool threads.
+    ctx = contextvars.copy_context()
+    result = await loop.run_in_executor(
+        BRIDGE_EXECUTOR, ctx.run, backend.app.wsgi_app, wsgi_environ(req), start_response
+    )
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": started["status"],
+            "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in started["headers"]],
+        })
+        # Streamed responses such as /api/export are pulled chunk by chunk on the pool
+        chunks = iter(result)
+        while True:
+            chunk = await loop.run_in_executor(BRIDGE_EXECUTOR, ctx.run, next, chunks, None)
+            if chunk is None:
+                break
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(result, "close"):
+            await loop.run_in_executor(BRIDGE_EXECUTOR, ctx.run, result.close)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if RESOURCE_LISTENER in backend.RESOURCE_LISTENERS:
+                backend.RESOURCE_LISTENERS.remove(RESOURCE_LISTENER)
+            if backend.COORDINATOR is not None:
+                backend.COORDINATOR.stop()
+            if backend.REPLAY_EXECUTOR is not None:
+                backend.REPLAY_EXECUTOR.shutdown(wait=False)
+            BRIDGE_EXECUTOR.shutdown(wait=False)
+            CRAWL_EXECUTOR.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+
+    req = AsgiRequest(scope, await read_body(receive))
+
+    if req.method == "GET":
+        status_match = SCAN_STATUS_PATTERN.match(req.path)
+        if status_match:
+            return await get_scan_status(req, send, status_match.group(1))
+        if req.path == "/api/urls":
+            return await get_urls(req, send)
+        if req.path == "/api/scan-settings":
+            return await get_scan_settings(req, send)
+    elif req.method == "POST" and req.path == "/scan":
+        return await post_scan(req, send)
+    await call_wsgi(req, send)
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("ASGI mode needs an ASGI server, e.g. pip install uvicorn")
+    uvicorn.run(application, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "5000")))
@@ -0,0 +1,70 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class SiteArm:
+    pages: int = 0
+    reward: float = 0.0
+    rounds: int = 0
+    exhausted: bool = False
+
+
+class BudgetAllocator:
+    """
+    Splits a scan's total page budget across its sites in rounds. Every site
+    gets one round first; after that each round goes to the site with the best
+    upper confidence bound on hit rate, so productive sites keep crawling and
+    empty ones stop early.
+    """
+
+    LEAK_SIGNAL_WEIGHT = 0.5
+    PRIOR_REWARD = 0.5
+    PRIOR_PAGES = 2
+
+    def __init__(self, sites: Iterable[int], total_pages: int, round_pages: int, exploration: float = 1.0):
+        self.arms: Dict[int, SiteArm] = {site: SiteArm() for site in sites}
+        self.total_pages = total_pages
+        self.round_pages = max(1, round_pages)
+        self.exploration = exploration
+
+    @property
+    def pages_used(self) -> int:
+        return sum(arm.pages for arm in self.arms.values())
+
+    @property
+    def pages_remaining(self) -> int:
+        return max(0, self.total_pages - self.pages_used)
+
+    def observe(self, site: int, pages: int, findings: List, exhausted: bool) -> None:
+        # Totals for the site so far, not increments, so a resumed scan can
+        # rebuild the allocator straight from its checkpoints.
+        arm = self.arms[site]
+        arm.pages = pages
+        arm.reward = sum(
+            int(finding.has_keywords) + self.LEAK_SIGNAL_WEIGHT * int(finding.has_leak_signals)
+            for finding in findings
+        )
+        arm.rounds += 1
+        arm.exhausted = exhausted
+
+    def score(self, site: int) -> float:
+        arm = self.arms[site]
+        mean = (arm.reward + self.PRIOR_REWARD) / (arm.pages + self.PRIOR_PAGES)
+        total = max(2, self.pages_used)
+        return mean + self.exploration * math.sqrt(math.log(total) / (arm.pages + self.PRIOR_PAGES))
+
+    def next_site(self) -> Optional[int]:
+        if self.pages_remaining <= 0:
+            return None
+        open_sites = [site for site, arm in self.arms.items() if not arm.exhausted]
+        if not open_sites:
+            return None
+        for site in open_sites:
+            if self.arms[site].rounds == 0:
+                return site
+        return max(open_sites, key=self.score)
+
+    def next_round_pages(self) -> int:
+        return min(self.round_pages, self.pages_remaining)
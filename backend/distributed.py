@@ -0,0 +1,494 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from polite_scraper import PoliteScraper
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id TEXT NOT NULL,
+    partition INTEGER NOT NULL,
+    site_index INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (partition, status, id);
+CREATE INDEX IF NOT EXISTS tasks_scan ON tasks (scan_id, status);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_scan ON results (scan_id, id);
+"""
+
+
+@dataclass
+class Task:
+    id: int
+    scan_id: str
+    site_index: int
+    url: str
+    keywords: List[str]
+    options: Dict[str, object]
+
+
+@dataclass
+class Result:
+    id: int
+    task_id: int
+    kind: str
+    payload: Dict[str, object]
+
+
+def partition_for(url: str, partitions: int) -> int:
+    # All work for one host lands on one worker, so that worker's rate limiter,
+    # robots cache and circuit breaker see every request to the host.
+    host = urlparse(url).netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    digest = hashlib.sha1(host.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % max(1, partitions)
+
+
+class SQLiteQueue:
+    """
+    Task and result queue shared by the coordinator and worker processes through
+    a SQLite file. Kept behind a small interface so a real broker can replace it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # The coordinator shares one connection between request threads.
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def submit(self, scan_id: str, partition: int, site_index: int, url: str, keywords: List[str], options: Dict[str, object]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO tasks (scan_id, partition, site_index, url, keywords, options) VALUES (?, ?, ?, ?, ?, ?)",
+                (scan_id, partition, site_index, url, json.dumps(keywords), json.dumps(options)),
+            )
+
+    def claim(self, partition: int, worker: str) -> Optional[Task]:
+        with self._lock:
+            row = self._claim_row(partition, worker)
+        if row is None:
+            return None
+        return Task(
+            id=row[0],
+            scan_id=row[1],
+            site_index=row[2],
+            url=row[3],
+            keywords=json.loads(row[4]),
+            options=json.loads(row[5]),
+        )
+
+    def _claim_row(self, partition: int, worker: str) -> Optional[tuple]:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id, scan_id, site_index, url, keywords, options FROM tasks "
+                "WHERE partition = ? AND status = 'pending' ORDER BY id LIMIT 1",
+                (partition,),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'running', worker = ?, claimed_at = ? WHERE id = ?",
+                    (worker, time.time(), row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def publish(self, task: Task, kind: str, payload: Dict[str, object]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO results (scan_id, task_id, kind, payload) VALUES (?, ?, ?, ?)",
+                (task.scan_id, task.id, kind, json.dumps(payload)),
+            )
+
+    def finish(self, task: Task, status: str = "done") -> None:
+        with self._lock:
+            self.conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task.id))
+
+    def results(self, scan_id: str, after_id: int = 0) -> List[Result]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, task_id, kind, payload FROM results WHERE scan_id = ? AND id > ? ORDER BY id",
+                (scan_id, after_id),
+            ).fetchall()
+        return [Result(id=row[0], task_id=row[1], kind=row[2], payload=json.loads(row[3])) for row in rows]
+
+    def counts(self, scan_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE scan_id = ? GROUP BY status",
+                (scan_id,),
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+    def _tasks(self, where: str, params: tuple) -> List[Task]:
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT id, scan_id, site_index, url, keywords, options FROM tasks WHERE {where}",
+                params,
+            ).fetchall()
+        return [
+            Task(id=row[0], scan_id=row[1], site_index=row[2], url=row[3], keywords=json.loads(row[4]), options=json.loads(row[5]))
+            for row in rows
+        ]
+
+    def running_tasks(self, worker: str) -> List[Task]:
+        return self._tasks("status = 'running' AND worker = ?", (worker,))
+
+    def scan_tasks(self, scan_id: str) -> List[Task]:
+        return self._tasks("scan_id = ?", (scan_id,))
+
+    def unfinished_tasks(self, scan_id: Optional[str] = None, partition: Optional[int] = None) -> List[Task]:
+        return self._tasks(
+            "status IN ('pending', 'running') AND (? IS NULL OR scan_id = ?) AND (? IS NULL OR partition = ?)",
+            (scan_id, scan_id, partition, partition),
+        )
+
+    def repartition(self, partitions: int) -> int:
+        """Move pending tasks to the partition their host maps to with this many workers."""
+        moved = 0
+        with self._lock:
+            rows = self.conn.execute("SELECT id, partition, url FROM tasks WHERE status = 'pending'").fetchall()
+            for task_id, partition, url in rows:
+                expected = partition_for(url, partitions)
+                if partition != expected:
+                    self.conn.execute("UPDATE tasks SET partition = ? WHERE id = ?", (expected, task_id))
+                    moved += 1
+        return moved
+
+    def delete_scan(self, scan_id: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM results WHERE scan_id = ?", (scan_id,))
+            self.conn.execute("DELETE FROM tasks WHERE scan_id = ?", (scan_id,))
+
+    def delete_orphaned_results(self) -> int:
+        # Results published by a worker after its scan was already collected and deleted
+        with self._lock:
+            cursor = self.conn.execute("DELETE FROM results WHERE task_id NOT IN (SELECT id FROM tasks)")
+        return cursor.rowcount
+
+    def requeue(self, task: Task) -> None:
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, claimed_at = NULL WHERE id = ?",
+                (task.id,),
+            )
+
+    def requeue_stale(self, max_age_seconds: float) -> int:
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE tasks SET status = 'pending', worker = NULL, claimed_at = NULL "
+                "WHERE status = 'running' AND claimed_at < ?",
+                (time.time() - max_age_seconds,),
+            )
+        return cursor.rowcount
+
+
+def run_task(scraper: PoliteScraper, queue: SQLiteQueue, task: Task, link_stats_path: Optional[str] = None) -> None:
+    options = dict(task.options)
+    # Other workers and the web app keep learning, so pick up their link stats per task
+    if link_stats_path:
+        scraper.load_link_stats(link_stats_path)
+    report = scraper.crawl(task.url, task.keywords, **options)
+    for finding in report.findings:
+        payload = finding.to_dict()
+        payload["site"] = task.url
+        queue.publish(task, "finding", payload)
+    queue.publish(task, "stats", {
+        "url": task.url,
+        "site_index": task.site_index,
+        "pages_scanned": report.pages_scanned,
+        "max_depth_reached": report.max_depth_reached,
+        "time_elapsed": report.time_elapsed,
+        "leak_entities": report.leak_entities,
+        "path_stats": report.path_stats,
+    })
+
+
+def worker_name(partition: int, pid: int) -> str:
+    return f"worker-{partition}-{pid}"
+
+
+def run_worker(
+    db_path: str,
+    partition: int,
+    scraper_options: Optional[Dict[str, object]] = None,
+    poll_interval: float = 1.0,
+    exit_when_idle: bool = False,
+    link_stats_path: Optional[str] = None,
+) -> None:
+    worker = worker_name(partition, os.getpid())
+    queue = SQLiteQueue(db_path)
+    scraper = PoliteScraper(**(scraper_options or {}))
+    print(f"[{worker}] started on partition {partition}")
+
+    try:
+        while True:
+            task = queue.claim(partition, worker)
+            if task is None:
+                if exit_when_idle:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            print(f"[{worker}] crawling {task.url} for scan {task.scan_id}")
+            try:
+                run_task(scraper, queue, task, link_stats_path)
+                queue.finish(task)
+            except Exception as exc:
+                print(f"[{worker}] task {task.id} failed: {exc}")
+                queue.publish(task, "error", {"url": task.url, "error": str(exc)})
+                queue.finish(task, "failed")
+    finally:
+        queue.close()
+
+
+class Coordinator:
+    """
+    Partitions scan sites across worker processes by host hash and collects the
+    findings they stream back through the queue. Workers that die are restarted
+    and their unfinished tasks requeued by check_workers().
+    """
+
+    # A task that has taken down this many workers is failed instead of retried
+    MAX_TASK_CRASHES = 2
+    # Minimum gap between restarts of one partition, so a worker that fails at
+    # startup does not respawn on every poll
+    RESTART_DELAY_SECONDS = 5.0
+    # A partition whose worker keeps dying young is given up and its tasks failed;
+    # a worker that stayed up for WORKER_STABLE_SECONDS resets the count.
+    MAX_WORKER_RESTARTS = 5
+    WORKER_STABLE_SECONDS = 60.0
+
+    def __init__(
+        self,
+        db_path: str,
+        workers: int,
+        scraper_options: Optional[Dict[str, object]] = None,
+        exit_when_idle: bool = False,
+        link_stats_path: Optional[str] = None,
+    ):
+        self.db_path = db_path
+        self.link_stats_path = link_stats_path
+        self.workers = max(1, workers)
+        self.scraper_options = scraper_options or {}
+        self.exit_when_idle = exit_when_idle
+        self.queue = SQLiteQueue(db_path)
+        # Spawned, not forked: the coordinator runs inside threaded servers
+        self.context = multiprocessing.get_context("spawn")
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.spawned_at: Dict[int, float] = {}
+        self.task_crashes: Dict[int, int] = {}
+        self.restarts: Dict[int, int] = {}
+        self.failed_partitions: Set[int] = set()
+        self.deadlines: Dict[str, float] = {}
+
+    def start(self) -> None:
+        # Tasks left running by workers of a previous coordinator will never finish
+        requeued = self.queue.requeue_stale(0)
+        if requeued:
+            print(f"Requeued {requeued} task(s) abandoned by previous workers")
+        # A previous coordinator may have run a different number of workers
+        moved = self.queue.repartition(self.workers)
+        if moved:
+            print(f"Moved {moved} pending task(s) to partitions of the current {self.workers} worker(s)")
+        self.queue.delete_orphaned_results()
+        for partition in range(self.workers):
+            self._spawn(partition)
+
+    def _spawn(self, partition: int) -> None:
+        process = self.context.Process(
+            target=run_worker,
+            args=(self.db_path, partition, self.scraper_options),
+            kwargs={"exit_when_idle": self.exit_when_idle, "link_stats_path": self.link_stats_path},
+            daemon=True,
+        )
+        process.start()
+        self.processes[partition] = process
+        self.spawned_at[partition] = time.time()
+
+    def _fail_tasks(self, tasks: List[Task], error: str) -> None:
+        for task in tasks:
+            self.queue.publish(task, "error", {"url": task.url, "error": error})
+            self.queue.finish(task, "failed")
+
+    def check_workers(self) -> int:
+        """
+        Restart dead workers and requeue the tasks they held, and fail the tasks of
+        partitions given up on and of scans past their deadline. Returns the number
+        of workers restarted.
+        """
+        for partition in self.failed_partitions:
+            self._fail_tasks(self.queue.unfinished_tasks(partition=partition), "no worker available for this host")
+        now = time.time()
+        for scan_id, deadline in list(self.deadlines.items()):
+            if now >= deadline:
+                print(f"Scan {scan_id} passed its deadline, failing its unfinished tasks")
+                self._fail_tasks(self.queue.unfinished_tasks(scan_id=scan_id), "scan time limit exceeded")
+                del self.deadlines[scan_id]
+
+        restarted = 0
+        for partition, process in list(self.processes.items()):
+            if process.is_alive():
+                continue
+            for task in self.queue.running_tasks(worker_name(partition, process.pid)):
+                crashes = self.task_crashes.get(task.id, 0) + 1
+                self.task_crashes[task.id] = crashes
+                if crashes >= self.MAX_TASK_CRASHES:
+                    print(f"Task {task.id} ({task.url}) crashed {crashes} worker(s), giving up")
+                    self.queue.publish(task, "error", {"url": task.url, "error": "worker process died"})
+                    self.queue.finish(task, "failed")
+                else:
+                    self.queue.requeue(task)
+            # Idle workers exit cleanly in exit_when_idle mode; only crashes are restarted
+            if self.exit_when_idle and process.exitcode == 0:
+                continue
+            if time.time() - self.spawned_at[partition] < self.RESTART_DELAY_SECONDS:
+                continue
+            if time.time() - self.spawned_at[partition] >= self.WORKER_STABLE_SECONDS:
+                self.restarts[partition] = 0
+            self.restarts[partition] = self.restarts.get(partition, 0) + 1
+            if self.restarts[partition] > self.MAX_WORKER_RESTARTS:
+                print(f"Worker for partition {partition} keeps dying (exit code {process.exitcode}), giving up")
+                del self.processes[partition]
+                self.failed_partitions.add(partition)
+                self._fail_tasks(self.queue.unfinished_tasks(partition=partition), "no worker available for this host")
+                continue
+            print(f"Worker for partition {partition} exited with code {process.exitcode}, restarting")
+            self._spawn(partition)
+            restarted += 1
+        return restarted
+
+    def stop(self) -> None:
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=5)
+        self.processes = {}
+
+    def submit(
+        self,
+        scan_id: str,
+        urls: List[str],
+        keywords: List[str],
+        options: Dict[str, object],
+        checkpoint_paths: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+    ) -> None:
+        # checkpoint_paths, when given, holds one crawl checkpoint file per site so
+        # a requeued or resumed site continues where its crawl stopped.
+        for site_index, url in enumerate(urls, start=1):
+            site_options = dict(options)
+            if checkpoint_paths:
+                site_options["checkpoint_path"] = checkpoint_paths[site_index - 1]
+            self.queue.submit(scan_id, partition_for(url, self.workers), site_index, url, keywords, site_options)
+        if deadline is not None:
+            self.deadlines[scan_id] = deadline
+
+    def forget(self, scan_id: str) -> None:
+        """Delete a collected scan's tasks and results from the queue."""
+        for task in self.queue.scan_tasks(scan_id):
+            self.task_crashes.pop(task.id, None)
+        self.queue.delete_scan(scan_id)
+        self.deadlines.pop(scan_id, None)
+
+    def results(self, scan_id: str, after_id: int = 0) -> List[Result]:
+        return self.queue.results(scan_id, after_id)
+
+    def progress(self, scan_id: str) -> Dict[str, int]:
+        counts = self.queue.counts(scan_id)
+        return {
+            "done": counts.get("done", 0) + counts.get("failed", 0),
+            "total": sum(counts.values()),
+        }
+
+    def is_complete(self, scan_id: str) -> bool:
+        progress = self.progress(scan_id)
+        return progress["done"] >= progress["total"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a multi-site scan across host-partitioned worker processes.")
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--keywords", required=True, help="comma separated keywords")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--db", default="scan_queue.db")
+    parser.add_argument("--max-pages", type=int, default=80)
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=None)
+    parser.add_argument("--requests-per-minute", type=float, default=12.0)
+    args = parser.parse_args()
+
+    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
+    scan_id = f"cli-{int(time.time())}"
+    coordinator = Coordinator(
+        args.db,
+        args.workers,
+        scraper_options={"requests_per_minute": args.requests_per_minute},
+        exit_when_idle=True,
+    )
+    coordinator.submit(scan_id, args.urls, keywords, {
+        "max_pages": args.max_pages,
+        "max_depth": args.max_depth,
+        "time_limit_seconds": args.time_limit,
+    })
+
+    start = time.time()
+    coordinator.start()
+    last_id = 0
+    pages = 0
+    while True:
+        coordinator.check_workers()
+        complete = coordinator.is_complete(scan_id)
+        for result in coordinator.results(scan_id, last_id):
+            last_id = result.id
+            if result.kind == "finding":
+                print(f"- {result.payload['url']} keywords={result.payload['found_keywords']} leak_signals={result.payload['leak_signals']}")
+            elif result.kind == "stats":
+                pages += result.payload["pages_scanned"]
+            else:
+                print(f"! {result.payload['url']}: {result.payload['error']}")
+        if complete:
+            break
+        time.sleep(0.5)
+    coordinator.forget(scan_id)
+    coordinator.stop()
+
+    elapsed = time.time() - start
+    print(f"Scanned {pages} page(s) across {len(args.urls)} site(s) with {args.workers} worker(s) in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
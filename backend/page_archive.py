@@ -0,0 +1,181 @@
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from polite_scraper import KeywordTable, PageFinding, PoliteScraper
+
+
+INDEX_SUFFIX = ".idx"
+RECORD_COMPRESS_LEVEL = 6
+
+
+@dataclass
+class ArchiveEntry:
+    url: str
+    offset: int
+    length: int
+    site: Optional[str] = None
+    depth: int = 0
+    fetched_at: str = ""
+
+
+class PageArchive:
+    """
+    Append-only archive of fetched pages. Every page is stored as its own gzip
+    member holding a WARC-style response record, so a record can be read by
+    seeking to its offset. The offset index is a JSON-lines file next to it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self._lock = threading.Lock()
+
+    def append(self, url: str, html: str, site: Optional[str] = None, depth: int = 0) -> ArchiveEntry:
+        body = html.encode("utf-8")
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        header = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {fetched_at}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        record = gzip.compress(header + body + b"\r\n\r\n", compresslevel=RECORD_COMPRESS_LEVEL)
+
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(record)
+            entry = ArchiveEntry(
+                url=url,
+                offset=offset,
+                length=len(record),
+                site=site,
+                depth=depth,
+                fetched_at=fetched_at,
+            )
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(asdict(entry)) + "\n")
+        return entry
+
+    def entries(self) -> List[ArchiveEntry]:
+        if not os.path.exists(self.index_path):
+            return []
+        entries = []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                # A crash mid-write can leave a truncated last line
+                try:
+                    entries.append(ArchiveEntry(**json.loads(line)))
+                except (ValueError, TypeError):
+                    continue
+        return entries
+
+    def read(self, entry: ArchiveEntry, f=None) -> str:
+        if f is None:
+            with open(self.path, "rb") as archive_file:
+                return self.read(entry, archive_file)
+        f.seek(entry.offset)
+        record = gzip.decompress(f.read(entry.length))
+        _, _, payload = record.partition(b"\r\n\r\n")
+        return payload[:-4].decode("utf-8")
+
+    def __iter__(self) -> Iterator[Tuple[ArchiveEntry, str]]:
+        entries = self.entries()
+        if not entries:
+            return
+        with open(self.path, "rb") as f:
+            for entry in entries:
+                yield entry, self.read(entry, f)
+
+
+_REPLAY_SCRAPER: Optional[PoliteScraper] = None
+
+
+def _replay_chunk(archive_path: str, entries: List[ArchiveEntry], keywords: List[str]) -> List[Tuple[Optional[str], PageFinding]]:
+    global _REPLAY_SCRAPER
+    if _REPLAY_SCRAPER is None:
+        _REPLAY_SCRAPER = PoliteScraper()
+    archive = PageArchive(archive_path)
+    keyword_table = KeywordTable(keywords)
+    hits = []
+    with open(archive_path, "rb") as f:
+        for entry in entries:
+            finding = _REPLAY_SCRAPER._analyze_page(
+                entry.url, archive.read(entry, f), keywords, keyword_table=keyword_table
+            )
+            if finding.is_hit:
+                hits.append((entry.site, finding))
+    return hits
+
+
+def replay_executor(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    # Spawned, not forked: callers such as the web app fork from a threaded
+    # process where crawl threads may hold logging, SQLite or requests locks.
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+
+def replay(
+    archive_path: str,
+    keywords: List[str],
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> List[Tuple[Optional[str], PageFinding]]:
+    """
+    Re-run page analysis over an archived crawl with a new keyword list, without
+    touching the network. Returns (site, finding) pairs for hits in archive order.
+    Long-lived callers pass a shared executor with `workers` processes.
+    """
+    # A crawl resumed from a checkpoint may have archived a page twice; keep the latest copy
+    entries = list({entry.url: entry for entry in PageArchive(archive_path).entries()}.values())
+    if not entries:
+        return []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(entries)))
+    if workers == 1:
+        return _replay_chunk(archive_path, entries, keywords)
+
+    # Contiguous chunks keep each worker's reads sequential in the archive file
+    chunk_size = -(-len(entries) // workers)
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    if executor is None:
+        with replay_executor(workers) as own_executor:
+            return _replay_chunks(own_executor, archive_path, chunks, keywords)
+    return _replay_chunks(executor, archive_path, chunks, keywords)
+
+
+def _replay_chunks(
+    executor: Executor, archive_path: str, chunks: List[List[ArchiveEntry]], keywords: List[str]
+) -> List[Tuple[Optional[str], PageFinding]]:
+    hits = []
+    for chunk_hits in executor.map(_replay_chunk, [archive_path] * len(chunks), chunks, [keywords] * len(chunks)):
+        hits.extend(chunk_hits)
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay an archived crawl with a new keyword list.")
+    parser.add_argument("archive")
+    parser.add_argument("--keywords", required=True, help="comma separated keywords")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    keywords = [k.strip() for k in args.keywords.split(",") if k.strip()]
+    hits = replay(args.archive, keywords, workers=args.workers)
+    for site, finding in hits:
+        print(f"- {finding.url} keywords={finding.found_keywords} leak_signals={finding.leak_signals}")
+    print(f"Replayed {len(PageArchive(args.archive).entries())} archived page(s): {len(hits)} hit(s)")
+
+
+if __name__ == "__main__":
+    main()
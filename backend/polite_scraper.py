@@ -1,24 +1,419 @@
+import base64
+import cProfile
 import csv
+import hashlib
+import io
 import json
+import math
+import os
+import pstats
 import random
 import re
+import socket
+import sys
+import threading
 import time
-from dataclasses import dataclass, asdict
+import xml.etree.ElementTree as ET
+import zlib
+from array import array
+from contextlib import nullcontext
+from html.parser import HTMLParser
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from heapq import heappop, heappush
-from typing import Dict, Iterable, List, Optional, Set, Tuple
-from urllib.parse import urljoin, urlparse, urlunparse
+from typing import TYPE_CHECKING, ContextManager, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import unquote_plus, urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
 
 import requests
 from bs4 import BeautifulSoup
+from urllib3.exceptions import NewConnectionError
+
+if TYPE_CHECKING:
+    from page_archive import PageArchive
+    from text_index import TextIndex
+
+
+class _TextExtractor(HTMLParser):
+    SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_text(html: str) -> str:
+    # Lightweight alternative to BeautifulSoup(...).get_text() for callers that
+    # only need the visible text, not a navigable tree.
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return " ".join(" ".join(extractor.parts).split())
+
+
+LEAK_SIGNAL_NAMES = ("emails", "phones", "wallets", "usernames", "dump_structure")
+
+
+class KeywordTable:
+    """
+    Per-scan keyword table. Findings store matched keywords as a bitmask of
+    positions in this table instead of a list of strings of their own.
+    """
+
+    __slots__ = ("keywords", "_bits")
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = ()
+        self._bits: Dict[str, int] = {}
+        ordered: List[str] = []
+        for kw in keywords:
+            if kw and kw not in self._bits:
+                self._bits[kw] = 1 << len(ordered)
+                ordered.append(sys.intern(kw))
+        self.keywords = tuple(ordered)
+
+    def bit(self, keyword: str) -> int:
+        return self._bits.get(keyword, 0)
+
+    def decode(self, mask: int) -> List[str]:
+        return [kw for index, kw in enumerate(self.keywords) if mask >> index & 1]
+
+
+class SimHashIndex:
+    """
+    Per-crawl index of 64-bit SimHash fingerprints. Fingerprints are split into
+    bands so any fingerprint within max_distance bits shares at least one band
+    with a stored one, keeping lookups to a handful of candidates.
+    """
+
+    BITS = 64
+    TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, max_distance: int = 3, shingle_size: int = 3, min_tokens: int = 20):
+        self.max_distance = max_distance
+        self.shingle_size = shingle_size
+        self.min_tokens = min_tokens
+        self.bands = max_distance + 1
+        self.band_bits = self.BITS // self.bands
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(self.bands)]
+
+    def fingerprint(self, text: str) -> Optional[int]:
+        tokens = self.TOKEN_PATTERN.findall(text.lower())
+        if len(tokens) < self.min_tokens:
+            return None
+        shingles = {
+            " ".join(tokens[i:i + self.shingle_size])
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+        hashes = [
+            format(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+            for shingle in shingles
+        ]
+        # Column-wise majority vote over the bit strings of all shingle hashes
+        half = len(hashes) / 2
+        bits = "".join("1" if column.count("1") > half else "0" for column in zip(*hashes))
+        return int(bits, 2)
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def check_and_add(self, text: str) -> bool:
+        fingerprint = self.fingerprint(text)
+        if fingerprint is None:
+            return False
+
+        keys = self._band_keys(fingerprint)
+        for band, key in enumerate(keys):
+            for candidate in self._buckets[band].get(key, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return True
+
+        self.add(fingerprint)
+        return False
+
+    def add(self, fingerprint: int) -> None:
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band].setdefault(key, []).append(fingerprint)
+
+    def fingerprints(self) -> List[int]:
+        # Every fingerprint is stored once per band; band 0 holds each exactly once
+        return [fingerprint for bucket in self._buckets[0].values() for fingerprint in bucket]
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """Distinct-count estimate in 2**precision one-byte registers (about 1.6% error at 12)."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_hash(self, hashed: int) -> None:
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting over the empty registers
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class CountMinSketch:
+    """Frequency estimates that never undercount, in depth x width fixed counters."""
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("I", bytes(4 * width)) for _ in range(depth)]
+
+    def _indexes(self, hashed: int) -> List[int]:
+        # Double hashing: row i probes h1 + i * h2
+        h1 = hashed & 0xFFFFFFFF
+        h2 = (hashed >> 32) | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add_hash(self, hashed: int) -> int:
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(hashed)):
+            row[index] += 1
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+
+class EntityCounter:
+    """
+    Crawl-wide counts for one kind of leak entity in fixed memory: exact values
+    until sample_cap distinct ones have been seen, a HyperLogLog distinct count
+    beyond that, and the top_k most frequent values from a count-min sketch.
+    """
+
+    # Samples are raw leaked values, so summaries carry only a few of them
+    SUMMARY_SAMPLES = 5
+
+    def __init__(self, sample_cap: int = 1000, top_k: int = 10):
+        self.sample_cap = sample_cap
+        self.top_k = top_k
+        self.samples: Set[str] = set()
+        self.overflowed = False
+        self.occurrences = 0
+        self.hll = HyperLogLog()
+        self.sketch = CountMinSketch()
+        self.top: Dict[str, int] = {}
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        self.occurrences += 1
+        self.hll.add_hash(hashed)
+        if value not in self.samples:
+            if len(self.samples) < self.sample_cap:
+                self.samples.add(value)
+            else:
+                self.overflowed = True
+
+        estimate = self.sketch.add_hash(hashed)
+        if value in self.top or len(self.top) < self.top_k:
+            self.top[value] = estimate
+        else:
+            weakest = min(self.top, key=self.top.get)
+            if estimate > self.top[weakest]:
+                del self.top[weakest]
+                self.top[value] = estimate
+
+    @property
+    def distinct(self) -> int:
+        if not self.overflowed:
+            return len(self.samples)
+        return max(self.hll.count(), len(self.samples))
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "distinct": self.distinct,
+            "exact": not self.overflowed,
+            "occurrences": self.occurrences,
+            "top": sorted(self.top.items(), key=lambda item: (-item[1], item[0])),
+            "samples": sorted(self.samples)[: self.SUMMARY_SAMPLES],
+        }
+
+    def to_state(self) -> Dict[str, object]:
+        return {
+            "samples": sorted(self.samples),
+            "overflowed": self.overflowed,
+            "occurrences": self.occurrences,
+            "hll": base64.b64encode(bytes(self.hll.registers)).decode("ascii"),
+            "sketch": [base64.b64encode(row.tobytes()).decode("ascii") for row in self.sketch.rows],
+            "top": self.top,
+        }
+
+    @classmethod
+    def from_state(cls, payload: Dict[str, object], sample_cap: int = 1000, top_k: int = 10) -> "EntityCounter":
+        counter = cls(sample_cap=sample_cap, top_k=top_k)
+        counter.samples = set(payload["samples"])
+        counter.overflowed = payload["overflowed"]
+        counter.occurrences = payload["occurrences"]
+        counter.hll.registers = bytearray(base64.b64decode(payload["hll"]))
+        for row, encoded in zip(counter.sketch.rows, payload["sketch"]):
+            row[:] = array("I", base64.b64decode(encoded))
+        counter.top = dict(payload["top"])
+        return counter
+
+
+class LeakEntityAggregator:
+    """Site-wide leak entities across every page of a crawl, one EntityCounter per kind."""
+
+    KINDS = ("emails", "phones", "wallets")
+
+    def __init__(self, sample_cap: int = 1000, top_k: int = 10):
+        self.sample_cap = sample_cap
+        self.top_k = top_k
+        self.counters = {kind: EntityCounter(sample_cap, top_k) for kind in self.KINDS}
+
+    def add_page(self, kind: str, values: Iterable[str]) -> None:
+        # Values are deduplicated per page, so frequencies count pages
+        counter = self.counters[kind]
+        for value in set(values):
+            counter.add(value)
+
+    def summary(self) -> Dict[str, Dict[str, object]]:
+        return {kind: counter.summary() for kind, counter in self.counters.items() if counter.occurrences}
+
+    def to_state(self) -> Dict[str, object]:
+        return {kind: counter.to_state() for kind, counter in self.counters.items()}
+
+    @classmethod
+    def from_state(cls, payload: Dict[str, object]) -> "LeakEntityAggregator":
+        aggregator = cls()
+        for kind, counter_state in payload.items():
+            aggregator.counters[kind] = EntityCounter.from_state(counter_state, aggregator.sample_cap, aggregator.top_k)
+        return aggregator
 
 
-@dataclass
 class PageFinding:
+    __slots__ = ("url", "page_type", "keyword_table", "keyword_mask", "leak_counts")
+
+    def __init__(
+        self,
+        url: str,
+        page_type: str,
+        leak_signals: Optional[Dict[str, int]] = None,
+        found_keywords: Optional[List[str]] = None,
+        keyword_table: Optional[KeywordTable] = None,
+        keyword_mask: int = 0,
+    ):
+        if keyword_table is None:
+            keyword_table = KeywordTable(found_keywords or [])
+        if found_keywords:
+            for kw in found_keywords:
+                keyword_mask |= keyword_table.bit(kw)
+
+        self.url = url
+        self.page_type = sys.intern(page_type)
+        self.keyword_table = keyword_table
+        self.keyword_mask = keyword_mask
+        # Counts aligned with LEAK_SIGNAL_NAMES, or None when the page had no signals
+        self.leak_counts: Optional[Tuple[int, ...]] = None
+        if leak_signals:
+            self.leak_counts = tuple(leak_signals.get(name, 0) for name in LEAK_SIGNAL_NAMES)
+
+    @property
+    def found_keywords(self) -> List[str]:
+        return self.keyword_table.decode(self.keyword_mask)
+
+    @property
+    def leak_signals(self) -> Dict[str, int]:
+        if self.leak_counts is None:
+            return {}
+        return {name: count for name, count in zip(LEAK_SIGNAL_NAMES, self.leak_counts) if count}
+
+    @property
+    def has_keywords(self) -> bool:
+        return self.keyword_mask != 0
+
+    @property
+    def has_leak_signals(self) -> bool:
+        return self.leak_counts is not None
+
+    @property
+    def is_hit(self) -> bool:
+        return self.keyword_mask != 0 or self.leak_counts is not None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "url": self.url,
+            "page_type": self.page_type,
+            "leak_signals": self.leak_signals,
+            "found_keywords": self.found_keywords,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PageFinding(url={self.url!r}, page_type={self.page_type!r}, "
+            f"leak_signals={self.leak_signals!r}, found_keywords={self.found_keywords!r})"
+        )
+
+
+@dataclass
+class PageTrace:
     url: str
-    page_type: str
-    leak_signals: Dict[str, int]
-    found_keywords: List[str]
+    depth: int
+    score: int
+    bytes: int = 0
+    wait: float = 0.0
+    fetch: float = 0.0
+    download: float = 0.0
+    parse: float = 0.0
+    analyze: float = 0.0
+    cache: str = "miss"
+
+
+@dataclass
+class HostThrottle:
+    interval: float
+    next_request_time: float = 0.0
+    latency_ewma: Optional[float] = None
+
+
+@dataclass
+class HostCircuit:
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    answered: bool = False
+
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
+
+class ContentRejectedError(requests.RequestException):
+    pass
+
+
+class DeadlineExceededError(requests.RequestException):
+    pass
 
 
 @dataclass
@@ -29,6 +424,116 @@ class CrawlReport:
     pages_scanned: int = 0
     max_depth_reached: int = 0
     time_elapsed: float = 0.0
+    duplicates_skipped: int = 0
+    trace: List[PageTrace] = field(default_factory=list)
+    profile: Optional[str] = None
+    # path template -> [pages fetched, pages with keyword or leak-signal hits]
+    path_stats: Dict[str, List[int]] = field(default_factory=dict)
+    # kind -> site-wide distinct count, top values and samples, see LeakEntityAggregator
+    leak_entities: Dict[str, Dict[str, object]] = field(default_factory=dict)
+
+
+@dataclass
+class CrawlState:
+    """
+    Everything a crawl needs to continue where it stopped: frontier, visited
+    set, partial findings and counters. Checkpoints are zlib-compressed JSON.
+    """
+
+    start_url: str
+    keyword_table: KeywordTable
+    fingerprints: Optional[SimHashIndex] = None
+    visited: Set[str] = field(default_factory=set)
+    # URLs with view parameters stripped, so only the first variant of a page is followed
+    view_keys: Set[str] = field(default_factory=set)
+    # (-priority, depth, url, anchor, static score) heap
+    queue: List[Tuple[float, int, str, str, int]] = field(default_factory=list)
+    requeues: Dict[str, int] = field(default_factory=dict)
+    findings: List[PageFinding] = field(default_factory=list)
+    pages_scanned: int = 0
+    max_depth_reached: int = 0
+    duplicates_skipped: int = 0
+    elapsed: float = 0.0
+    seeded: bool = False
+    entities: LeakEntityAggregator = field(default_factory=LeakEntityAggregator)
+
+    CHECKPOINT_VERSION = 1
+
+    def to_bytes(self) -> bytes:
+        payload = {
+            "version": self.CHECKPOINT_VERSION,
+            "start_url": self.start_url,
+            "keywords": list(self.keyword_table.keywords),
+            "fingerprints": self.fingerprints.fingerprints() if self.fingerprints is not None else None,
+            "visited": sorted(self.visited),
+            "view_keys": sorted(self.view_keys),
+            "queue": self.queue,
+            "requeues": self.requeues,
+            "findings": [
+                [finding.url, finding.page_type, finding.keyword_mask, finding.leak_signals]
+                for finding in self.findings
+            ],
+            "pages_scanned": self.pages_scanned,
+            "max_depth_reached": self.max_depth_reached,
+            "duplicates_skipped": self.duplicates_skipped,
+            "elapsed": self.elapsed,
+            "seeded": self.seeded,
+            "entities": self.entities.to_state(),
+        }
+        return zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CrawlState":
+        payload = json.loads(zlib.decompress(data).decode("utf-8"))
+        if payload.get("version") != cls.CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {payload.get('version')}")
+
+        keyword_table = KeywordTable(payload["keywords"])
+        fingerprints = None
+        if payload["fingerprints"] is not None:
+            fingerprints = SimHashIndex()
+            for fingerprint in payload["fingerprints"]:
+                fingerprints.add(fingerprint)
+
+        return cls(
+            start_url=payload["start_url"],
+            keyword_table=keyword_table,
+            fingerprints=fingerprints,
+            visited=set(payload["visited"]),
+            view_keys=set(payload.get("view_keys", [])),
+            queue=[tuple(entry) for entry in payload["queue"]],
+            requeues=payload["requeues"],
+            findings=[
+                PageFinding(
+                    url=url,
+                    page_type=page_type,
+                    leak_signals=leak_signals,
+                    keyword_table=keyword_table,
+                    keyword_mask=keyword_mask,
+                )
+                for url, page_type, keyword_mask, leak_signals in payload["findings"]
+            ],
+            pages_scanned=payload["pages_scanned"],
+            max_depth_reached=payload["max_depth_reached"],
+            duplicates_skipped=payload["duplicates_skipped"],
+            elapsed=payload["elapsed"],
+            seeded=payload["seeded"],
+            entities=LeakEntityAggregator.from_state(payload["entities"])
+            if "entities" in payload
+            else LeakEntityAggregator(),
+        )
+
+    def save(self, path: str) -> None:
+        # Write-then-rename so a crash mid-write never leaves a torn checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(self.to_bytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CrawlState":
+        with open(path, "rb") as handle:
+            return cls.from_bytes(handle.read())
 
 
 class PoliteScraper:
@@ -77,6 +582,33 @@ class PoliteScraper:
         "/page/",
     ]
 
+    # Tracking and session parameters are dropped and the rest are sorted, so
+    # variants of one page collapse to one URL.
+    IGNORED_QUERY_PREFIXES = ("utm_",)
+    IGNORED_QUERY_PARAMS = {
+        "ref",
+        "highlight",
+        "sessionid",
+        "session_id",
+        "sid",
+        "phpsessid",
+        "jsessionid",
+        "fbclid",
+        "gclid",
+        "msclkid",
+    }
+    # Parameters that usually re-render a listing. They can also select distinct
+    # content, so they are kept in the URL and only the first variant of a page
+    # is followed.
+    VIEW_QUERY_PARAMS = {
+        "sort",
+        "order",
+        "orderby",
+        "dir",
+        "view",
+        "print",
+    }
+
     USERNAME_LABELS = [
         "username",
         "user",
@@ -92,6 +624,77 @@ class PoliteScraper:
         r"\bT[a-zA-Z0-9]{33}\b",  # TRON
     ]
 
+    # Adaptive per-host throttling: speed up toward the configured ceiling while a
+    # host answers quickly, back off on rising latency or 429/503 responses.
+    OVERLOAD_STATUS_CODES = {429, 503}
+    THROTTLE_SPEEDUP_FACTOR = 0.9
+    THROTTLE_BACKOFF_FACTOR = 2.0
+    THROTTLE_LATENCY_RATIO = 1.5
+    THROTTLE_EWMA_WEIGHT = 0.3
+    MAX_BACKOFF_INTERVAL_SECONDS = 300.0
+    MAX_RETRY_AFTER_SECONDS = 120.0
+    MAX_REQUEUES_PER_URL = 2
+    # Throttled URLs go back behind the host's other work so in-scope hosts that
+    # aren't throttled keep going while this one cools down.
+    THROTTLED_REQUEUE_PENALTY = 2.0
+
+    # Per-host circuit breaker and bounded retries so a dead or flaky host fails
+    # fast instead of burning the crawl's time budget on full timeouts.
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    CIRCUIT_COOLDOWN_SECONDS = 120.0
+    CONNECT_TIMEOUT_SECONDS = 5
+    RETRY_ATTEMPTS = 2
+    RETRY_BASE_DELAY_SECONDS = 0.5
+    RETRY_MAX_DELAY_SECONDS = 4.0
+    TRANSIENT_STATUS_CODES = {502, 504}
+    DNS_NEGATIVE_TTL_SECONDS = 60.0
+
+    # Resources that can never contain a keyword match are rejected by extension
+    # at enqueue time and by Content-Type/Content-Length before the body is read.
+    SKIPPED_EXTENSIONS = (
+        ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx",
+        ".jpg", ".jpeg", ".png", ".gif", ".webp", ".bmp", ".svg", ".ico", ".tif", ".tiff",
+        ".mp3", ".mp4", ".m4a", ".wav", ".ogg", ".flac", ".avi", ".mov", ".mkv", ".webm", ".wmv",
+        ".zip", ".rar", ".7z", ".tar", ".gz", ".tgz", ".bz2", ".xz",
+        ".exe", ".msi", ".dmg", ".iso", ".apk", ".bin",
+        ".css", ".js", ".woff", ".woff2", ".ttf", ".eot",
+    )
+    DEFAULT_ALLOWED_CONTENT_TYPES = (
+        "text/html",
+        "application/xhtml+xml",
+        "text/plain",
+        "text/xml",
+        "application/xml",
+    )
+    DEFAULT_MAX_CONTENT_BYTES = 5 * 1024 * 1024
+    CONTENT_CHUNK_BYTES = 64 * 1024
+
+    # Sitemap seeding: (max age in days, score boost) for recently modified pages.
+    SITEMAP_LASTMOD_BOOSTS = ((7, 3), (30, 2), (365, 1))
+    MAX_SITEMAP_FILES = 10
+    DEFAULT_MAX_SITEMAP_URLS = 500
+    # Share of the crawl's page and time budget the sitemap stage may use
+    SITEMAP_BUDGET_SHARE = 0.2
+    SITEMAP_CONTENT_TYPES = (
+        "text/xml",
+        "application/xml",
+        "text/plain",
+        "application/gzip",
+        "application/x-gzip",
+        "application/octet-stream",
+    )
+
+    # Learned prioritization: per-site path template hit rates from past crawls
+    # are blended with the static _score_link heuristics (UCB-style exploration).
+    LEARNED_SCORE_WEIGHT = 6.0
+    DEFAULT_EXPLORATION_WEIGHT = 1.0
+    MAX_TEMPLATES_PER_SITE = 500
+    TEMPLATE_MAX_SEGMENTS = 4
+    TEMPLATE_ID_PATTERN = re.compile(r"^(?:[0-9a-f]{8,}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})$")
+    TEMPLATE_NUMBER_PATTERN = re.compile(r"\d+")
+
+    DEFAULT_CHECKPOINT_EVERY_PAGES = 10
+
     EMAIL_PATTERN = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b")
     PHONE_PATTERN = re.compile(r"\b(?:\+?\d{1,3}[\s-]?)?(?:\(?\d{2,4}\)?[\s-]?)?\d{3,4}[\s-]?\d{4}\b")
 
@@ -101,26 +704,169 @@ class PoliteScraper:
         requests_per_minute: float = 3.0,
         timeout: int = 12,
         proxies: Optional[List[str]] = None,
+        max_requests_per_minute: Optional[float] = None,
+        allowed_content_types: Optional[Iterable[str]] = None,
+        max_content_bytes: Optional[int] = None,
     ):
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": user_agent})
         self.timeout = timeout
 
         self.request_interval = 60.0 / max(0.1, requests_per_minute)
-        self.last_request_time = 0.0
+        self.min_request_interval = 60.0 / max(0.1, max_requests_per_minute or requests_per_minute)
+        self.host_throttles: Dict[str, HostThrottle] = {}
+        self.host_circuits: Dict[str, HostCircuit] = {}
+        # Hostnames that failed to resolve, with the time the failure expires
+        self.dns_failures: Dict[str, float] = {}
+        self._throttle_lock = threading.Lock()
+
+        self.allowed_content_types: Set[str] = {
+            t.strip().lower() for t in (allowed_content_types or self.DEFAULT_ALLOWED_CONTENT_TYPES) if t.strip()
+        }
+        self.max_content_bytes = max_content_bytes or self.DEFAULT_MAX_CONTENT_BYTES
+
+        # site -> path template -> [pages fetched, pages with hits]
+        self.link_stats: Dict[str, Dict[str, List[int]]] = {}
+        self._link_stats_lock = threading.Lock()
 
         self.cache: Dict[str, Tuple[float, str]] = {}
         self.proxies = proxies or []
         self.robots: Dict[str, RobotFileParser] = {}
 
-    def _respect_rate_limit(self) -> None:
-        now = time.time()
-        elapsed = now - self.last_request_time
-        if elapsed < self.request_interval:
-            sleep_time = self.request_interval - elapsed + random.uniform(0.3, 1.2)
-            print(f"Rate limiting - sleeping {sleep_time:.2f} seconds")
+    def _get_throttle(self, url: str) -> HostThrottle:
+        host = urlparse(url).netloc.lower()
+        throttle = self.host_throttles.get(host)
+        if throttle is None:
+            throttle = self.host_throttles.setdefault(host, HostThrottle(interval=self.request_interval))
+        return throttle
+
+    def _clamp_interval(self, interval: float) -> float:
+        min_interval = min(self.min_request_interval, self.request_interval)
+        max_interval = max(self.MAX_BACKOFF_INTERVAL_SECONDS, self.request_interval)
+        return max(min_interval, min(interval, max_interval))
+
+    def _respect_rate_limit(self, url: str, deadline: Optional[float] = None) -> float:
+        throttle = self._get_throttle(url)
+        # Reserve the next slot under the lock so concurrent scans hitting the
+        # same host queue up behind each other instead of firing together.
+        with self._throttle_lock:
+            now = time.time()
+            scheduled = max(now, throttle.next_request_time)
+            if scheduled > now:
+                scheduled += random.uniform(0.3, 1.2)
+            # Don't sleep past the caller's deadline; the slot stays free for others
+            if deadline is not None and scheduled >= deadline:
+                raise DeadlineExceededError(
+                    f"Next slot for {urlparse(url).netloc} is {scheduled - now:.1f}s away, past the deadline"
+                )
+            throttle.next_request_time = scheduled + self._clamp_interval(throttle.interval)
+
+        sleep_time = scheduled - now
+        if sleep_time > 0:
+            print(f"Rate limiting {urlparse(url).netloc} - sleeping {sleep_time:.2f} seconds")
             time.sleep(sleep_time)
-        self.last_request_time = time.time()
+        return sleep_time
+
+    def _record_latency(self, url: str, latency: float) -> None:
+        throttle = self._get_throttle(url)
+        with self._throttle_lock:
+            if throttle.latency_ewma is not None and latency > throttle.latency_ewma * self.THROTTLE_LATENCY_RATIO:
+                throttle.interval = self._clamp_interval(throttle.interval * self.THROTTLE_BACKOFF_FACTOR)
+            else:
+                throttle.interval = self._clamp_interval(throttle.interval * self.THROTTLE_SPEEDUP_FACTOR)
+
+            if throttle.latency_ewma is None:
+                throttle.latency_ewma = latency
+            else:
+                throttle.latency_ewma += self.THROTTLE_EWMA_WEIGHT * (latency - throttle.latency_ewma)
+
+    def _record_overload(self, url: str, retry_after: Optional[float]) -> None:
+        throttle = self._get_throttle(url)
+        with self._throttle_lock:
+            throttle.interval = self._clamp_interval(
+                max(throttle.interval, self.request_interval) * self.THROTTLE_BACKOFF_FACTOR
+            )
+            if retry_after is not None:
+                resume_at = time.time() + min(retry_after, self.MAX_RETRY_AFTER_SECONDS)
+                throttle.next_request_time = max(throttle.next_request_time, resume_at)
+        print(f"Host overloaded: {urlparse(url).netloc} -> interval {throttle.interval:.2f}s, retry after {retry_after}")
+
+    def _circuit_is_open(self, host: str) -> bool:
+        circuit = self.host_circuits.get(host)
+        return circuit is not None and circuit.open_until > time.time()
+
+    def _record_connection_failure(self, host: str) -> bool:
+        with self._throttle_lock:
+            circuit = self.host_circuits.setdefault(host, HostCircuit())
+            circuit.consecutive_failures += 1
+            # Once tripped, a single failed probe after the cooldown re-opens it.
+            if circuit.consecutive_failures < self.CIRCUIT_FAILURE_THRESHOLD:
+                return False
+            circuit.open_until = time.time() + self.CIRCUIT_COOLDOWN_SECONDS
+        print(f"Circuit opened for {host} after {circuit.consecutive_failures} consecutive failures")
+        return True
+
+    def _record_connection_success(self, host: str) -> None:
+        circuit = self.host_circuits.get(host)
+        if circuit is None or circuit.consecutive_failures or not circuit.answered:
+            with self._throttle_lock:
+                circuit = self.host_circuits.setdefault(host, HostCircuit())
+                circuit.consecutive_failures = 0
+                circuit.open_until = 0.0
+                circuit.answered = True
+
+    def _dns_failed(self, url: str) -> bool:
+        # Negative-only DNS cache: a name that failed to resolve is refused for
+        # DNS_NEGATIVE_TTL_SECONDS. Nothing is looked up here; failures are
+        # recorded from the request's own resolution error.
+        hostname = urlparse(url).hostname
+        return not hostname or self.dns_failures.get(hostname, 0.0) > time.time()
+
+    @staticmethod
+    def _caused_by(exc: BaseException, causes: Tuple[type, ...]) -> bool:
+        # requests wraps urllib3's MaxRetryError, which wraps the connection
+        # error, which carries the socket error as its cause.
+        pending: List[Optional[BaseException]] = [exc]
+        seen: Set[int] = set()
+        while pending:
+            current = pending.pop()
+            if current is None or id(current) in seen:
+                continue
+            seen.add(id(current))
+            if isinstance(current, causes):
+                return True
+            pending.extend([current.__cause__, current.__context__, getattr(current, "reason", None)])
+            pending.extend(arg for arg in current.args if isinstance(arg, BaseException))
+        return False
+
+    def _record_connection_error(self, url: str, exc: BaseException, direct: bool) -> bool:
+        """Count a failed request towards the host's circuit; True if retrying is pointless."""
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        circuit_opened = self._record_connection_failure(host)
+        # Through a proxy the name is resolved on the proxy side
+        if direct and parsed.hostname and self._caused_by(exc, (socket.gaierror,)):
+            print(f"DNS resolution failed: {parsed.hostname}")
+            self.dns_failures[parsed.hostname] = time.time() + self.DNS_NEGATIVE_TTL_SECONDS
+            return True
+        # A host that never accepted a connection is unlikely to on the next try
+        if self._caused_by(exc, (requests.ConnectTimeout, NewConnectionError)):
+            circuit = self.host_circuits.get(host)
+            if circuit is None or not circuit.answered:
+                return True
+        return circuit_opened
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
 
     def _get_proxy(self) -> Optional[Dict[str, str]]:
         if not self.proxies:
@@ -136,9 +882,31 @@ class PoliteScraper:
 
         robots_url = urljoin(base, "/robots.txt")
         rp = RobotFileParser()
+        rp.set_url(robots_url)
+        # Fetched through the session (instead of rp.read()) so robots.txt gets the
+        # same connect timeout and counts towards the host's circuit breaker.
+        host = parsed.netloc.lower()
+        proxies = self._get_proxy()
         try:
-            rp.set_url(robots_url)
-            rp.read()
+            if self._circuit_is_open(host):
+                raise CircuitOpenError(f"Circuit open for {host}")
+            if proxies is None and self._dns_failed(robots_url):
+                raise requests.ConnectionError(f"Could not resolve host {host}")
+            resp = self.session.get(
+                robots_url,
+                timeout=(min(self.CONNECT_TIMEOUT_SECONDS, self.timeout), self.timeout),
+                proxies=proxies,
+            )
+            self._record_connection_success(host)
+            if resp.status_code in (401, 403):
+                rp.disallow_all = True
+            elif 400 <= resp.status_code < 500:
+                rp.allow_all = True
+            elif resp.ok:
+                rp.parse(resp.text.splitlines())
+        except (requests.ConnectionError, requests.Timeout) as exc:
+            self._record_connection_error(robots_url, exc, proxies is None)
+            rp.parse("".splitlines())
         except Exception:
             rp.parse("".splitlines())
         self.robots[base] = rp
@@ -148,15 +916,55 @@ class PoliteScraper:
         rp = self._get_robot_parser(url)
         return rp.can_fetch(self.session.headers.get("User-Agent", "*"), url)
 
+    @staticmethod
+    def _query_key(part: str) -> str:
+        return unquote_plus(part.split("=", 1)[0]).lower()
+
     def _normalize_url(self, url: str) -> str:
         parsed = urlparse(url)
-        cleaned = parsed._replace(fragment="")
+        query = parsed.query
+        if query:
+            # Filter and sort the raw pairs so values keep their original
+            # encoding and blank flags like ?foo are not rewritten
+            params = [
+                part
+                for part in query.split("&")
+                if part
+                and self._query_key(part) not in self.IGNORED_QUERY_PARAMS
+                and not self._query_key(part).startswith(self.IGNORED_QUERY_PREFIXES)
+            ]
+            query = "&".join(sorted(params))
+        path_params = "" if "jsessionid" in parsed.params.lower() else parsed.params
+        cleaned = parsed._replace(
+            scheme=parsed.scheme.lower(),
+            netloc=parsed.netloc.lower(),
+            params=path_params,
+            query=query,
+            fragment="",
+        )
         return urlunparse(cleaned)
 
     def _is_low_value_url(self, url: str) -> bool:
         lowered = url.lower()
         return any(token in lowered for token in self.LOW_VALUE_PATTERNS)
 
+    def _has_skipped_extension(self, url: str) -> bool:
+        return urlparse(url).path.lower().endswith(self.SKIPPED_EXTENSIONS)
+
+    def _view_key(self, url: str) -> str:
+        """Return a normalized URL with its view parameters stripped."""
+        parsed = urlparse(url)
+        params = [part for part in parsed.query.split("&") if part and self._query_key(part) not in self.VIEW_QUERY_PARAMS]
+        return urlunparse(parsed._replace(query="&".join(params)))
+
+    def _is_repeat_view(self, url: str, view_keys: Set[str]) -> bool:
+        """Record url's view key and tell whether another variant already had it."""
+        key = self._view_key(url)
+        if key in view_keys:
+            return key != url
+        view_keys.add(key)
+        return False
+
     def _is_in_scope(self, url: str, root_host: str, include_subdomains: bool) -> bool:
         parsed = urlparse(url)
         if parsed.scheme not in {"http", "https"}:
@@ -217,7 +1025,74 @@ class PoliteScraper:
 
         return score
 
-    def _detect_leak_signals(self, text: str) -> Dict[str, int]:
+    def _site_key(self, url: str) -> str:
+        host = urlparse(url).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _path_template(self, url: str) -> str:
+        segments = [segment for segment in urlparse(url).path.lower().split("/") if segment]
+        template = []
+        for segment in segments[: self.TEMPLATE_MAX_SEGMENTS]:
+            if self.TEMPLATE_ID_PATTERN.match(segment):
+                template.append("{id}")
+            else:
+                template.append(self.TEMPLATE_NUMBER_PATTERN.sub("{n}", segment))
+        if len(segments) > self.TEMPLATE_MAX_SEGMENTS:
+            template.append("*")
+        return "/" + "/".join(template)
+
+    def _learned_priority(
+        self,
+        site_stats: Optional[Dict[str, List[int]]],
+        site_fetches: int,
+        url: str,
+        score: int,
+        exploration: float,
+    ) -> float:
+        if not site_stats:
+            return float(score)
+        fetches, hits = site_stats.get(self._path_template(url), (0, 0))
+        # Beta(1, 1) prior keeps unseen templates at an even hit rate
+        hit_rate = (hits + 1) / (fetches + 2)
+        bonus = exploration * math.sqrt(math.log(site_fetches + 1) / (fetches + 1))
+        return score + self.LEARNED_SCORE_WEIGHT * hit_rate + bonus
+
+    def update_link_stats(self, report: CrawlReport) -> None:
+        self.merge_path_stats(report.site, report.path_stats)
+
+    def merge_path_stats(self, site: str, path_stats: Dict[str, List[int]]) -> None:
+        # Also used for path stats that worker processes report back as JSON
+        if not path_stats:
+            return
+        site_key = self._site_key(site)
+        with self._link_stats_lock:
+            site_stats = dict(self.link_stats.get(site_key, {}))
+            for template, (fetches, hits) in path_stats.items():
+                previous = site_stats.get(template, [0, 0])
+                site_stats[template] = [previous[0] + fetches, previous[1] + hits]
+            if len(site_stats) > self.MAX_TEMPLATES_PER_SITE:
+                ranked = sorted(site_stats.items(), key=lambda item: item[1][0], reverse=True)
+                site_stats = dict(ranked[: self.MAX_TEMPLATES_PER_SITE])
+            # Swapped in whole so crawls reading the old dict never see partial updates
+            self.link_stats[site_key] = site_stats
+
+    def load_link_stats(self, path: str) -> None:
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            with self._link_stats_lock:
+                self.link_stats = data
+
+    def snapshot_link_stats(self) -> Dict[str, Dict[str, List[int]]]:
+        # Per-site dicts are never mutated once swapped in, so copying the outer
+        # dict under the lock is enough for a consistent view to serialize.
+        with self._link_stats_lock:
+            return dict(self.link_stats)
+
+    def _detect_leak_signals(self, text: str, entities: Optional[LeakEntityAggregator] = None) -> Dict[str, int]:
         leak_signals: Dict[str, int] = {}
 
         emails = self.EMAIL_PATTERN.findall(text)
@@ -228,11 +1103,16 @@ class PoliteScraper:
         if phones:
             leak_signals["phones"] = len(set(phones))
 
-        wallet_count = 0
+        wallets = []
         for pattern in self.WALLET_PATTERNS:
-            wallet_count += len(re.findall(pattern, text))
-        if wallet_count:
-            leak_signals["wallets"] = wallet_count
+            wallets.extend(re.findall(pattern, text))
+        if wallets:
+            leak_signals["wallets"] = len(wallets)
+
+        if entities is not None:
+            entities.add_page("emails", (email.lower() for email in emails))
+            entities.add_page("phones", phones)
+            entities.add_page("wallets", wallets)
 
         username_count = 0
         lowered = text.lower()
@@ -254,41 +1134,226 @@ class PoliteScraper:
         use_cache: bool = True,
         max_age_seconds: int = 86400,
         allow_low_value: bool = False,
+        fetch_stats: Optional[Dict[str, object]] = None,
+        deadline: Optional[float] = None,
+        sitemap: bool = False,
     ) -> Optional[str]:
+        # fetch_stats, when given, is filled with the cache status and the
+        # seconds spent waiting on the rate limiter, on the response headers
+        # (fetch) and on reading the body (download), and with the body's size
+        # in bytes as received.
+        # A URL whose throttle slot falls after deadline is deferred, not fetched.
+        stats: Dict[str, object] = fetch_stats if fetch_stats is not None else {}
+        stats.update({"cache": "miss", "wait": 0.0, "fetch": 0.0, "download": 0.0, "bytes": 0})
+
         url = self._normalize_url(url)
         if use_cache and url in self.cache:
             timestamp, html = self.cache[url]
             if time.time() - timestamp < max_age_seconds:
                 print(f"Cache hit: {url}")
+                stats["cache"] = "hit"
                 return html
 
         if not self._allowed_by_robots(url):
             print(f"Blocked by robots.txt: {url}")
+            stats["cache"] = "blocked"
             return None
 
         if not allow_low_value and self._is_low_value_url(url):
             print(f"Skipping low-value url: {url}")
+            stats["cache"] = "skipped"
             return None
 
-        self._respect_rate_limit()
+        if not sitemap and self._has_skipped_extension(url):
+            print(f"Skipping non-text url: {url}")
+            stats["cache"] = "skipped"
+            return None
 
         try:
-            resp = self.session.get(
-                url,
-                allow_redirects=True,
-                timeout=self.timeout,
-                proxies=self._get_proxy(),
-            )
-            resp.raise_for_status()
-            html = resp.text
-            self.cache[url] = (time.time(), html)
-            return html
+            return self._fetch(url, stats, deadline=deadline, sitemap=sitemap)
+        except DeadlineExceededError as exc:
+            print(f"Deferred: {url} -> {exc}")
+            stats["cache"] = "deferred"
+            return None
         except requests.RequestException as exc:
             print(f"Request failed: {url} -> {exc}")
+            if stats["cache"] == "miss":
+                stats["cache"] = "error"
             return None
 
-    def _extract_links(self, html: str, base_url: str) -> List[Tuple[str, str]]:
-        soup = BeautifulSoup(html, "html.parser")
+    def _fetch(
+        self,
+        url: str,
+        stats: Dict[str, object],
+        use_proxy: bool = True,
+        deadline: Optional[float] = None,
+        sitemap: bool = False,
+    ) -> str:
+        host = urlparse(url).netloc.lower()
+        if self._circuit_is_open(host):
+            stats["cache"] = "circuit_open"
+            raise CircuitOpenError(f"Circuit open for {host}, skipping {url}")
+
+        proxies = self._get_proxy() if use_proxy else None
+        # With a proxy the name is resolved on the proxy side, so only check direct requests.
+        if proxies is None and self._dns_failed(url):
+            self._record_connection_failure(host)
+            raise requests.ConnectionError(f"Could not resolve host {host}")
+
+        timeout = (min(self.CONNECT_TIMEOUT_SECONDS, self.timeout), self.timeout)
+        for attempt in range(self.RETRY_ATTEMPTS + 1):
+            if attempt:
+                backoff = random.uniform(0, min(self.RETRY_MAX_DELAY_SECONDS, self.RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+                print(f"Retrying {url} in {backoff:.2f} seconds (attempt {attempt + 1})")
+                time.sleep(backoff)
+                stats["wait"] += backoff
+            stats["wait"] += self._respect_rate_limit(url, deadline)
+
+            fetch_start = time.perf_counter()
+            try:
+                resp = self.session.get(
+                    url,
+                    allow_redirects=True,
+                    timeout=timeout,
+                    proxies=proxies,
+                    stream=True,
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                stats["fetch"] += time.perf_counter() - fetch_start
+                if self._record_connection_error(url, exc, proxies is None) or attempt == self.RETRY_ATTEMPTS:
+                    raise
+                continue
+            # Only the answering attempt's latency feeds the throttle, not failed tries
+            latency = time.perf_counter() - fetch_start
+            stats["fetch"] += latency
+            self._record_connection_success(host)
+
+            if resp.status_code in self.TRANSIENT_STATUS_CODES and attempt < self.RETRY_ATTEMPTS:
+                resp.close()
+                continue
+            break
+
+        try:
+            if resp.status_code in self.OVERLOAD_STATUS_CODES:
+                stats["cache"] = "throttled"
+                self._record_overload(url, self._parse_retry_after(resp.headers.get("Retry-After")))
+            else:
+                self._record_latency(url, latency)
+
+            resp.raise_for_status()
+            self._check_content_headers(url, resp, stats, self.SITEMAP_CONTENT_TYPES if sitemap else None)
+            download_start = time.perf_counter()
+            try:
+                html = self._read_sitemap(resp, stats) if sitemap else self._read_text(resp, stats)
+            finally:
+                stats["download"] += time.perf_counter() - download_start
+        finally:
+            resp.close()
+
+        self.cache[url] = (time.time(), html)
+        return html
+
+    def fetch_probe(
+        self,
+        url: str,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[float] = None,
+        max_age_seconds: int = 86400,
+        slot: Optional[ContextManager] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        # Single-page fetch for keyword probes: the cache, robots.txt and content
+        # filters of get(), sent as this scraper's User-Agent, but no rate limiter.
+        # Callers bound concurrency themselves, holding slot around the request.
+        # Returns (html, None) or (None, reason).
+        url = self._normalize_url(url)
+        cached = self.cache.get(url)
+        if cached and time.time() - cached[0] < max_age_seconds:
+            return cached[1], None
+        if self._has_skipped_extension(url):
+            return None, "not a text resource"
+        if not self._allowed_by_robots(url):
+            return None, "blocked by robots.txt"
+
+        stats: Dict[str, object] = {}
+        try:
+            with slot if slot is not None else nullcontext():
+                resp = (session or self.session).get(
+                    url,
+                    headers={"User-Agent": self.session.headers.get("User-Agent")},
+                    timeout=timeout or self.timeout,
+                    stream=True,
+                )
+                try:
+                    resp.raise_for_status()
+                    self._check_content_headers(url, resp, stats)
+                    html = self._read_text(resp)
+                finally:
+                    resp.close()
+        except requests.RequestException as exc:
+            return None, str(exc)
+
+        self.cache[url] = (time.time(), html)
+        return html, None
+
+    def _check_content_headers(
+        self,
+        url: str,
+        resp: requests.Response,
+        stats: Dict[str, object],
+        allowed_content_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        content_type = resp.headers.get("Content-Type", "").split(";", 1)[0].strip().lower()
+        if content_type and content_type not in (allowed_content_types or self.allowed_content_types):
+            stats["cache"] = "rejected"
+            raise ContentRejectedError(f"Unsupported content type {content_type} for {url}")
+
+        content_length = resp.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > self.max_content_bytes:
+            stats["cache"] = "rejected"
+            raise ContentRejectedError(f"Content length {content_length} exceeds {self.max_content_bytes} bytes for {url}")
+
+    def _read_body(self, resp: requests.Response, stats: Optional[Dict[str, object]] = None) -> bytes:
+        # Bodies without a Content-Length are cut off at max_content_bytes.
+        # stats["bytes"] gets the size as received, before any decoding.
+        chunks: List[bytes] = []
+        received = 0
+        for chunk in resp.iter_content(self.CONTENT_CHUNK_BYTES):
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= self.max_content_bytes:
+                print(f"Truncating {resp.url} at {self.max_content_bytes} bytes")
+                break
+        body = b"".join(chunks)[: self.max_content_bytes]
+        if stats is not None:
+            stats["bytes"] = len(body)
+        return body
+
+    def _read_sitemap(self, resp: requests.Response, stats: Optional[Dict[str, object]] = None) -> str:
+        body = self._read_body(resp, stats)
+        if body[:2] == b"\x1f\x8b":
+            # .xml.gz sitemaps arrive as raw gzip; inflate at most max_content_bytes
+            try:
+                body = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(body, self.max_content_bytes)
+            except zlib.error as exc:
+                raise ContentRejectedError(f"Invalid gzip sitemap {resp.url}: {exc}")
+        # The sitemap protocol requires UTF-8 whatever the Content-Type says
+        return body.decode("utf-8", errors="replace")
+
+    def _read_text(self, resp: requests.Response, stats: Optional[Dict[str, object]] = None) -> str:
+        body = self._read_body(resp, stats)
+        try:
+            return body.decode(resp.encoding or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+    def _extract_links(
+        self,
+        html: str,
+        base_url: str,
+        soup: Optional[BeautifulSoup] = None,
+    ) -> List[Tuple[str, str]]:
+        if soup is None:
+            soup = BeautifulSoup(html, "html.parser")
         links: List[Tuple[str, str]] = []
 
         for a in soup.find_all("a", href=True):
@@ -301,24 +1366,37 @@ class PoliteScraper:
 
         return links
 
-    def _analyze_page(self, url: str, html: str, keywords: List[str]) -> PageFinding:
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text(separator=" ", strip=True)
+    def _analyze_page(
+        self,
+        url: str,
+        html: str,
+        keywords: List[str],
+        soup: Optional[BeautifulSoup] = None,
+        keyword_table: Optional[KeywordTable] = None,
+        text: Optional[str] = None,
+        entities: Optional[LeakEntityAggregator] = None,
+    ) -> PageFinding:
+        if soup is None:
+            soup = BeautifulSoup(html, "html.parser")
+        if keyword_table is None:
+            keyword_table = KeywordTable(keywords)
+        if text is None:
+            text = soup.get_text(separator=" ", strip=True)
         lowered = text.lower()
         
         # Log text preview and length
         text_preview = lowered[:200] if lowered else "(empty)"
         print(f"TEXT EXTRACT from {url}: {text_preview}... (total: {len(lowered)} chars)")
 
-        found_keywords = []
+        keyword_mask = 0
         for kw in keywords:
             if kw and kw.lower() in lowered:
                 print(f"✓ MATCH: Found '{kw}' on {url}")
-                found_keywords.append(kw)
+                keyword_mask |= keyword_table.bit(kw)
             elif kw:
                 print(f"✗ NO MATCH: '{kw}' not found on {url}")
 
-        leak_signals = self._detect_leak_signals(text)
+        leak_signals = self._detect_leak_signals(text, entities)
 
         page_type = "other"
         if soup.find("table"):
@@ -330,7 +1408,152 @@ class PoliteScraper:
             url=url,
             page_type=page_type,
             leak_signals=leak_signals,
-            found_keywords=found_keywords,
+            keyword_table=keyword_table,
+            keyword_mask=keyword_mask,
+        )
+
+    def _sitemap_locations(self, home_url: str) -> List[str]:
+        rp = self._get_robot_parser(home_url)
+        locations = [urljoin(home_url, location) for location in rp.site_maps() or []]
+        locations.append(urljoin(home_url, "/sitemap.xml"))
+        return list(dict.fromkeys(locations))
+
+    def _iter_sitemap_entries(
+        self, sitemap_url: str, deadline: Optional[float] = None
+    ) -> Iterator[Tuple[str, Optional[str], bool]]:
+        # Yields (loc, lastmod, is_sitemap) as elements close, feeding the parser
+        # in chunks and clearing each element so large sitemaps stay cheap.
+        text = self.get(sitemap_url, allow_low_value=True, deadline=deadline, sitemap=True)
+        if not text:
+            return
+
+        parser = ET.XMLPullParser(events=("end",))
+        loc: Optional[str] = None
+        lastmod: Optional[str] = None
+        try:
+            for offset in range(0, len(text), self.CONTENT_CHUNK_BYTES):
+                parser.feed(text[offset:offset + self.CONTENT_CHUNK_BYTES])
+                for _, elem in parser.read_events():
+                    tag = elem.tag.rsplit("}", 1)[-1]
+                    if tag == "loc":
+                        loc = (elem.text or "").strip()
+                    elif tag == "lastmod":
+                        lastmod = (elem.text or "").strip()
+                    elif tag in ("url", "sitemap"):
+                        if loc:
+                            yield loc, lastmod, tag == "sitemap"
+                        loc = lastmod = None
+                        elem.clear()
+            parser.close()
+        except ET.ParseError as exc:
+            print(f"Sitemap parse failed: {sitemap_url} -> {exc}")
+
+    def _lastmod_boost(self, lastmod: Optional[str]) -> int:
+        if not lastmod:
+            return 0
+        try:
+            modified = datetime.fromisoformat(lastmod.replace("Z", "+00:00"))
+        except ValueError:
+            try:
+                modified = datetime.fromisoformat(lastmod[:10])
+            except ValueError:
+                return 0
+        if modified.tzinfo is None:
+            modified = modified.replace(tzinfo=timezone.utc)
+
+        age_days = (datetime.now(timezone.utc) - modified).days
+        for max_age, boost in self.SITEMAP_LASTMOD_BOOSTS:
+            if age_days <= max_age:
+                return boost
+        return 0
+
+    def _seed_from_sitemaps(
+        self,
+        home_url: str,
+        root_host: str,
+        include_subdomains: bool,
+        max_urls: int,
+        deadline: Optional[float],
+        max_files: int = MAX_SITEMAP_FILES,
+    ) -> List[Tuple[int, str]]:
+        pending = self._sitemap_locations(home_url)
+        seen_sitemaps: Set[str] = set()
+        seeds: List[Tuple[int, str]] = []
+
+        while pending and len(seen_sitemaps) < max_files and len(seeds) < max_urls:
+            if deadline is not None and time.time() >= deadline:
+                break
+            sitemap_url = self._normalize_url(pending.pop(0))
+            if sitemap_url in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sitemap_url)
+
+            for loc, lastmod, is_sitemap in self._iter_sitemap_entries(sitemap_url, deadline):
+                normalized = self._normalize_url(urljoin(sitemap_url, loc))
+                if not self._is_in_scope(normalized, root_host, include_subdomains):
+                    continue
+                if is_sitemap:
+                    pending.append(normalized)
+                    continue
+                if self._has_skipped_extension(normalized):
+                    continue
+                score = self._score_link(normalized, "") + self._lastmod_boost(lastmod)
+                if score <= 0:
+                    continue
+                seeds.append((score, normalized))
+                if len(seeds) >= max_urls:
+                    break
+
+        print(f"Sitemap seeding: {len(seeds)} url(s) from {len(seen_sitemaps)} sitemap(s)")
+        return seeds
+
+    def _parse_and_analyze(
+        self,
+        url: str,
+        html: str,
+        keywords: List[str],
+        profiler: Optional[cProfile.Profile] = None,
+        keyword_table: Optional[KeywordTable] = None,
+        fingerprints: Optional[SimHashIndex] = None,
+        entities: Optional[LeakEntityAggregator] = None,
+    ) -> Tuple[Optional[PageFinding], BeautifulSoup, str, float, float]:
+        # Parse once so link extraction can reuse the soup, and time the parse
+        # and analysis stages separately for tracing. Near-duplicates of a page
+        # already seen in this crawl return no finding and are not analyzed.
+        parse_start = time.perf_counter()
+        soup = BeautifulSoup(html, "html.parser")
+        text = soup.get_text(separator=" ", strip=True)
+        is_duplicate = fingerprints is not None and fingerprints.check_and_add(text)
+        parse_elapsed = time.perf_counter() - parse_start
+        if is_duplicate:
+            print(f"Near-duplicate content, skipping analysis: {url}")
+            return None, soup, text, parse_elapsed, 0.0
+
+        analyze_start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            finding = self._analyze_page(
+                url, html, keywords, soup=soup, keyword_table=keyword_table, text=text, entities=entities
+            )
+        finally:
+            if profiler is not None:
+                profiler.disable()
+        analyze_elapsed = time.perf_counter() - analyze_start
+
+        return finding, soup, text, parse_elapsed, analyze_elapsed
+
+    def _format_profile(self, profiler: cProfile.Profile, limit: int = 30) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def new_crawl_state(self, start_url: str, keywords: List[str], skip_near_duplicates: bool = True) -> CrawlState:
+        return CrawlState(
+            start_url=self._normalize_url(start_url),
+            keyword_table=KeywordTable(keywords),
+            fingerprints=SimHashIndex() if skip_near_duplicates else None,
         )
 
     def crawl(
@@ -343,94 +1566,215 @@ class PoliteScraper:
         time_limit_seconds: Optional[float] = None,
         max_depth: int = 3,
         allow_low_value_urls: bool = True,
+        trace: bool = False,
+        profile: bool = False,
+        use_sitemaps: bool = False,
+        max_sitemap_urls: int = DEFAULT_MAX_SITEMAP_URLS,
+        exploration: float = DEFAULT_EXPLORATION_WEIGHT,
+        skip_near_duplicates: bool = True,
+        state: Optional["CrawlState"] = None,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY_PAGES,
+        archive: Optional["PageArchive"] = None,
+        text_index: Optional["TextIndex"] = None,
+        index_scan_id: Optional[str] = None,
     ) -> CrawlReport:
         start_url = self._normalize_url(start_url)
         parsed = urlparse(start_url)
         home_url = f"{parsed.scheme}://{parsed.netloc}"
         root_host = parsed.netloc
-        start_time = time.time()
 
-        visited: Set[str] = set()
-        findings: List[PageFinding] = []
+        if state is None and checkpoint_path and os.path.exists(checkpoint_path):
+            state = CrawlState.load(checkpoint_path)
+            print(f"Resuming from checkpoint {checkpoint_path}: {state.pages_scanned} page(s), {len(state.queue)} queued")
+        if state is None:
+            state = self.new_crawl_state(start_url, keywords, skip_near_duplicates)
+        # Time already spent on this crawl before a restart counts against the limit
+        start_time = time.time() - state.elapsed
+        deadline = start_time + time_limit_seconds if time_limit_seconds is not None else None
+
+        visited = state.visited
+        view_keys = state.view_keys
+        requeues = state.requeues
+        findings = state.findings
+        queue = state.queue
+        keyword_table = state.keyword_table
+        fingerprints = state.fingerprints
+        path_stats: Dict[str, List[int]] = {}
+        site_stats = self.link_stats.get(self._site_key(start_url))
+        site_fetches = sum(fetches for fetches, _ in site_stats.values()) if site_stats else 0
+        page_traces: List[PageTrace] = []
+        profiler = cProfile.Profile() if profile else None
+        last_checkpoint_pages = state.pages_scanned
+        deferred: List[Tuple[float, int, str, str, int]] = []
 
         # Seed with the provided start URL first - fetch directly to bypass robots.txt for user-provided URLs
         print("\n=== CRAWL START ===")
         print(f"Start URL: {start_url}")
         print(f"Keywords: {keywords}")
         print(f"Max pages: {max_pages}, Time limit: {time_limit_seconds}s, Max depth: {max_depth}")
-        
-        try:
-            # Fetch seed URL directly, bypassing robots.txt check since user explicitly provided it
-            self._respect_rate_limit()
-            seed_response = self.session.get(start_url, allow_redirects=True, timeout=self.timeout)
-            seed_response.raise_for_status()
-            seed_html = seed_response.text
-            self.cache[start_url] = (time.time(), seed_html)
-            print(f"SUCCESS: Fetched seed URL ({len(seed_html)} bytes)")
-        except Exception as e:
-            elapsed_time = time.time() - start_time
-            if elapsed_time < 0.01:
-                elapsed_time = 0.01
-            print(f"ERROR: Could not fetch seed URL {start_url}: {e}")
-            print(f"Time elapsed before failure: {elapsed_time:.2f}s")
-            # Still count as 1 page attempted even if it failed
-            return CrawlReport(site=home_url, found=False, findings=[], pages_scanned=1, max_depth_reached=0, time_elapsed=elapsed_time)
-        
-        seed_finding = self._analyze_page(start_url, seed_html, keywords)
-        print(f"Seed page found keywords: {seed_finding.found_keywords}")
-        if seed_finding.leak_signals or seed_finding.found_keywords:
-            findings.append(seed_finding)
-
-        # Initialize counters AFTER analyzing seed page
-        visited.add(start_url)  # Mark seed as visited
-        pages_scanned = 1  # Count the seed URL
-        max_depth_reached = 0  # Seed is at depth 0
-
-        links = self._extract_links(seed_html, start_url)
-        print(f"Extracted {len(links)} links from seed page")
-        queue: List[Tuple[int, int, str, str]] = []
-
-        skipped_low_value = 0
-        for link, anchor in links:
-            normalized = self._normalize_url(link)
-            if not self._is_in_scope(normalized, root_host, include_subdomains):
-                continue
-            score = self._score_link(normalized, anchor)
-            if score <= 0:
-                skipped_low_value += 1
-                continue
-            heappush(queue, (-score, 1, normalized, anchor))
 
-        print(f"Queue size: {len(queue)} (skipped {skipped_low_value} low-value links)")
-        while queue and pages_scanned < max_pages:
+        if not state.seeded:
+            seed_stats: Dict[str, object] = {"cache": "miss", "wait": 0.0, "fetch": 0.0, "download": 0.0, "bytes": 0}
+            seed_trace = PageTrace(url=start_url, depth=0, score=0)
+            try:
+                # Fetch seed URL directly, bypassing robots.txt check since user explicitly provided it
+                try:
+                    seed_html = self._fetch(start_url, seed_stats, use_proxy=False, deadline=deadline)
+                finally:
+                    seed_trace.wait = seed_stats["wait"]
+                    seed_trace.fetch = seed_stats["fetch"]
+                    seed_trace.download = seed_stats["download"]
+                    seed_trace.bytes = seed_stats["bytes"]
+                print(f"SUCCESS: Fetched seed URL ({seed_trace.bytes} bytes)")
+            except Exception as e:
+                elapsed_time = time.time() - start_time
+                if elapsed_time < 0.01:
+                    elapsed_time = 0.01
+                print(f"ERROR: Could not fetch seed URL {start_url}: {e}")
+                print(f"Time elapsed before failure: {elapsed_time:.2f}s")
+                seed_trace.cache = "error" if seed_stats["cache"] == "miss" else seed_stats["cache"]
+                # Still count as 1 page attempted even if it failed
+                return CrawlReport(
+                    site=home_url,
+                    found=False,
+                    findings=[],
+                    pages_scanned=1,
+                    max_depth_reached=0,
+                    time_elapsed=elapsed_time,
+                    trace=[seed_trace] if trace else [],
+                )
+
+            seed_finding, seed_soup, seed_text, seed_trace.parse, seed_trace.analyze = self._parse_and_analyze(
+                start_url, seed_html, keywords, profiler, keyword_table, fingerprints, state.entities
+            )
+            if archive is not None:
+                archive.append(start_url, seed_html, site=start_url, depth=0)
+            if text_index is not None:
+                text_index.add_document(
+                    start_url, seed_text, scan_id=index_scan_id, site=start_url, page_type=seed_finding.page_type
+                )
+            if trace:
+                page_traces.append(seed_trace)
+            print(f"Seed page found keywords: {seed_finding.found_keywords}")
+            path_stats[self._path_template(start_url)] = [1, int(seed_finding.is_hit)]
+            if seed_finding.is_hit:
+                findings.append(seed_finding)
+
+            # Initialize counters AFTER analyzing seed page
+            visited.add(start_url)  # Mark seed as visited
+            view_keys.add(self._view_key(start_url))
+            state.pages_scanned = 1  # Count the seed URL
+            state.max_depth_reached = 0  # Seed is at depth 0
+
+            links = self._extract_links(seed_html, start_url, soup=seed_soup)
+            print(f"Extracted {len(links)} links from seed page")
+
+            skipped_low_value = 0
+            for link, anchor in links:
+                normalized = self._normalize_url(link)
+                if not self._is_in_scope(normalized, root_host, include_subdomains):
+                    continue
+                if self._has_skipped_extension(normalized) or self._is_repeat_view(normalized, view_keys):
+                    continue
+                score = self._score_link(normalized, anchor)
+                if score <= 0:
+                    skipped_low_value += 1
+                    continue
+                priority = self._learned_priority(site_stats, site_fetches, normalized, score, exploration)
+                heappush(queue, (-priority, 1, normalized, anchor, score))
+
+            if use_sitemaps:
+                # Sitemap fetches don't count as pages, so cap the stage to a share
+                # of the page and time budget to leave room for the crawl itself.
+                sitemap_files = max(1, min(self.MAX_SITEMAP_FILES, int(max_pages * self.SITEMAP_BUDGET_SHARE)))
+                sitemap_deadline = None
+                if deadline is not None:
+                    sitemap_deadline = time.time() + max(0.0, deadline - time.time()) * self.SITEMAP_BUDGET_SHARE
+                for score, sitemap_url in self._seed_from_sitemaps(
+                    home_url, root_host, include_subdomains, max_sitemap_urls, sitemap_deadline, sitemap_files
+                ):
+                    if sitemap_url not in visited:
+                        priority = self._learned_priority(site_stats, site_fetches, sitemap_url, score, exploration)
+                        heappush(queue, (-priority, 1, sitemap_url, "", score))
+
+            state.seeded = True
+            print(f"Queue size: {len(queue)} (skipped {skipped_low_value} low-value links)")
+
+        while queue and state.pages_scanned < max_pages:
             if time_limit_seconds is not None and (time.time() - start_time) >= time_limit_seconds:
                 print(f"Time limit reached: {time.time() - start_time:.1f}s >= {time_limit_seconds}s")
                 break
-            neg_score, depth, url, anchor = heappop(queue)
-            score = -neg_score
+            if checkpoint_path and state.pages_scanned - last_checkpoint_pages >= checkpoint_every:
+                state.elapsed = time.time() - start_time
+                state.save(checkpoint_path)
+                last_checkpoint_pages = state.pages_scanned
+            neg_priority, depth, url, anchor, score = heappop(queue)
             if url in visited:
                 continue
             visited.add(url)
-            
-            max_depth_reached = max(max_depth_reached, depth)
 
-            html = self.get(url, allow_low_value=allow_low_value_urls)
+            state.max_depth_reached = max(state.max_depth_reached, depth)
+
+            fetch_stats: Dict[str, object] = {}
+            html = self.get(url, allow_low_value=allow_low_value_urls, fetch_stats=fetch_stats, deadline=deadline)
+            page_trace = PageTrace(
+                url=url,
+                depth=depth,
+                score=score,
+                wait=fetch_stats["wait"],
+                fetch=fetch_stats["fetch"],
+                download=fetch_stats["download"],
+                bytes=fetch_stats["bytes"],
+                cache=fetch_stats["cache"],
+            )
+            if trace:
+                page_traces.append(page_trace)
             if not html:
+                # Host asked us to slow down: keep the URL instead of dropping it,
+                # the throttle already pushed this host's next slot back.
+                if fetch_stats["cache"] == "throttled" and requeues.get(url, 0) < self.MAX_REQUEUES_PER_URL:
+                    requeues[url] = requeues.get(url, 0) + 1
+                    visited.discard(url)
+                    heappush(queue, (neg_priority + self.THROTTLED_REQUEUE_PENALTY, depth, url, anchor, score))
+                elif fetch_stats["cache"] == "deferred":
+                    # Its host can't be reached before the time limit; leave it
+                    # unvisited so a resumed crawl still picks it up.
+                    visited.discard(url)
+                    deferred.append((neg_priority, depth, url, anchor, score))
                 continue
 
-            page_finding = self._analyze_page(url, html, keywords)
-            if page_finding.leak_signals or page_finding.found_keywords:
+            page_finding, soup, page_text, page_trace.parse, page_trace.analyze = self._parse_and_analyze(
+                url, html, keywords, profiler, keyword_table, fingerprints, state.entities
+            )
+            if page_finding is None:
+                # Same content as a page already analyzed: don't count it against
+                # max_pages and don't expand its links again.
+                page_trace.cache = "duplicate"
+                state.duplicates_skipped += 1
+                continue
+            if archive is not None:
+                archive.append(url, html, site=start_url, depth=depth)
+            if text_index is not None:
+                text_index.add_document(
+                    url, page_text, scan_id=index_scan_id, site=start_url, page_type=page_finding.page_type
+                )
+            if page_finding.is_hit:
                 findings.append(page_finding)
 
-            pages_scanned += 1
+            template_stats = path_stats.setdefault(self._path_template(url), [0, 0])
+            template_stats[0] += 1
+            template_stats[1] += int(page_finding.is_hit)
+
+            state.pages_scanned += 1
 
             # Only expand if this is a high-priority path or leak signals exist
-            should_expand = score >= min_priority_to_expand or bool(page_finding.leak_signals)
+            should_expand = score >= min_priority_to_expand or page_finding.has_leak_signals
             if not should_expand:
                 continue
 
             # Dynamic depth: deeper for higher scores or when keywords are found
-            if bool(page_finding.found_keywords):
+            if page_finding.has_keywords:
                 # Found keywords - go deeper to find more instances
                 effective_max_depth = max_depth
             elif score >= 5:
@@ -446,15 +1790,23 @@ class PoliteScraper:
             if depth >= effective_max_depth:
                 continue
 
-            for child_url, child_anchor in self._extract_links(html, url):
+            for child_url, child_anchor in self._extract_links(html, url, soup=soup):
                 normalized = self._normalize_url(child_url)
                 if not self._is_in_scope(normalized, root_host, include_subdomains):
                     continue
+                if self._has_skipped_extension(normalized) or self._is_repeat_view(normalized, view_keys):
+                    continue
                 child_score = self._score_link(normalized, child_anchor)
                 if child_score <= 0:
                     continue
-                heappush(queue, (-child_score, depth + 1, normalized, child_anchor))
-
+                child_priority = self._learned_priority(
+                    site_stats, site_fetches, normalized, child_score, exploration
+                )
+                heappush(queue, (-child_priority, depth + 1, normalized, child_anchor, child_score))
+
+        for entry in deferred:
+            heappush(queue, entry)
+        pages_scanned = state.pages_scanned
         # Log why crawl stopped
         if not queue:
             print(f"Crawl ended: Queue empty")
@@ -462,6 +1814,9 @@ class PoliteScraper:
             print(f"Crawl ended: Max pages reached ({pages_scanned}/{max_pages})")
         
         elapsed_time = time.time() - start_time
+        state.elapsed = elapsed_time
+        if checkpoint_path:
+            state.save(checkpoint_path)
         # Ensure minimum time is recorded (even very fast scans take some time)
         if elapsed_time < 0.01:
             elapsed_time = 0.01
@@ -471,23 +1826,31 @@ class PoliteScraper:
             print(f"WARNING: pages_scanned was {pages_scanned}, forcing to 1")
             pages_scanned = 1
         
-        found = any(finding.leak_signals or finding.found_keywords for finding in findings)
+        found = any(finding.is_hit for finding in findings)
         
         print(f"=== CRAWL COMPLETE ===")
         print(f"Pages scanned: {pages_scanned}")
-        print(f"Max depth reached: {max_depth_reached}")
+        print(f"Max depth reached: {state.max_depth_reached}")
         print(f"Time elapsed: {elapsed_time:.2f}s")
         print(f"Keywords found: {found}")
         print(f"Total findings: {len(findings)}")
+        print(f"Near-duplicates skipped: {state.duplicates_skipped}")
         
-        return CrawlReport(
+        report = CrawlReport(
             site=home_url,
             found=found,
-            findings=findings,
+            findings=list(findings),
             pages_scanned=pages_scanned,
-            max_depth_reached=max_depth_reached,
+            max_depth_reached=state.max_depth_reached,
             time_elapsed=elapsed_time,
+            duplicates_skipped=state.duplicates_skipped,
+            trace=page_traces,
+            profile=self._format_profile(profiler) if profiler is not None else None,
+            path_stats=path_stats,
+            leak_entities=state.entities.summary(),
         )
+        self.update_link_stats(report)
+        return report
 
     def save_results_to_csv(self, report: CrawlReport, csv_path: str) -> None:
         with open(csv_path, "w", newline="", encoding="utf-8") as f:
@@ -507,7 +1870,7 @@ class PoliteScraper:
         payload = {
             "site": report.site,
             "found": report.found,
-            "findings": [asdict(finding) for finding in report.findings],
+            "findings": [finding.to_dict() for finding in report.findings],
         }
         with open(json_path, "w", encoding="utf-8") as f:
             json.dump(payload, f, indent=2)
@@ -0,0 +1,197 @@
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scan_id TEXT,
+    url TEXT NOT NULL,
+    site TEXT,
+    page_type TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS documents_scan_url ON documents (scan_id, url);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (token, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+"""
+
+TOKEN_PATTERN = re.compile(r"\w+")
+MAX_TOKEN_LENGTH = 64
+# Freed pages are returned to the filesystem a batch at a time, so searches and
+# crawl writes can take the lock between batches.
+INCREMENTAL_VACUUM_PAGES = 1024
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) <= MAX_TOKEN_LENGTH]
+
+
+class TextIndex:
+    """
+    On-disk inverted index from token to the crawled pages containing it, with
+    token positions so multi-word keywords can be matched as phrases.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Crawl threads write and request threads search through one connection.
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        # auto_vacuum only changes on an empty database or through a VACUUM, so an
+        # index created before incremental mode gets one full rebuild here.
+        if self.conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add_document(
+        self,
+        url: str,
+        text: str,
+        scan_id: Optional[str] = None,
+        site: Optional[str] = None,
+        page_type: Optional[str] = None,
+    ) -> None:
+        positions: Dict[str, array] = {}
+        for position, token in enumerate(tokenize(text)):
+            positions.setdefault(token, array("I")).append(position)
+
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-indexing a page within the same scan replaces its postings
+                row = self.conn.execute(
+                    "SELECT id FROM documents WHERE scan_id IS ? AND url = ?", (scan_id, url)
+                ).fetchone()
+                if row is not None:
+                    self._delete_documents([row[0]])
+                doc_id = self.conn.execute(
+                    "INSERT INTO documents (scan_id, url, site, page_type, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                    (scan_id, url, site, page_type, time.time()),
+                ).lastrowid
+                self.conn.executemany(
+                    "INSERT INTO postings (token, doc_id, positions) VALUES (?, ?, ?)",
+                    ((token, doc_id, token_positions.tobytes()) for token, token_positions in positions.items()),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def _postings(self, token: str) -> Dict[int, array]:
+        postings = {}
+        for doc_id, blob in self.conn.execute("SELECT doc_id, positions FROM postings WHERE token = ?", (token,)):
+            positions = array("I")
+            positions.frombytes(blob)
+            postings[doc_id] = positions
+        return postings
+
+    def search(
+        self,
+        query: str,
+        scan_id: Optional[str] = None,
+        since: Optional[float] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, object]]:
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            postings = {token: self._postings(token) for token in set(tokens)}
+            # Intersect from the rarest token so the candidate set shrinks fastest
+            candidates = None
+            for token in sorted(postings, key=lambda t: len(postings[t])):
+                doc_ids = postings[token].keys()
+                candidates = set(doc_ids) if candidates is None else candidates & doc_ids
+                if not candidates:
+                    return []
+
+            if len(tokens) > 1:
+                candidates = {doc_id for doc_id in candidates if self._has_phrase(tokens, postings, doc_id)}
+
+            matches = []
+            for doc_id in sorted(candidates, reverse=True):
+                row = self.conn.execute(
+                    "SELECT scan_id, url, site, page_type, indexed_at FROM documents WHERE id = ?", (doc_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                if scan_id is not None and row[0] != scan_id:
+                    continue
+                if since is not None and row[4] < since:
+                    continue
+                matches.append({
+                    "scan_id": row[0],
+                    "url": row[1],
+                    "site": row[2],
+                    "page_type": row[3],
+                    "indexed_at": row[4],
+                })
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    def _has_phrase(self, tokens: List[str], postings: Dict[str, Dict[int, array]], doc_id: int) -> bool:
+        following = [set(postings[token][doc_id]) for token in tokens[1:]]
+        for start in postings[tokens[0]][doc_id]:
+            if all(start + offset in positions for offset, positions in enumerate(following, start=1)):
+                return True
+        return False
+
+    def _delete_documents(self, doc_ids: List[int]) -> None:
+        placeholders = ",".join("?" * len(doc_ids))
+        self.conn.execute(f"DELETE FROM postings WHERE doc_id IN ({placeholders})", doc_ids)
+        self.conn.execute(f"DELETE FROM documents WHERE id IN ({placeholders})", doc_ids)
+
+    def compact(self, retention_seconds: float) -> int:
+        """Drop pages indexed before the retention window and reclaim their space."""
+        cutoff = time.time() - retention_seconds
+        with self._lock:
+            # Document ids grow with indexing time, so everything below the first
+            # id still inside the window has expired.
+            row = self.conn.execute("SELECT MIN(id) FROM documents WHERE indexed_at >= ?", (cutoff,)).fetchone()
+            if row[0] is None:
+                row = self.conn.execute("SELECT MAX(id) + 1 FROM documents").fetchone()
+            first_kept = row[0]
+            oldest = self.conn.execute("SELECT MIN(id) FROM documents").fetchone()[0]
+            if first_kept is None or oldest is None or oldest >= first_kept:
+                return 0
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                removed = self.conn.execute("DELETE FROM documents WHERE id < ?", (first_kept,)).rowcount
+                if removed:
+                    self.conn.execute("DELETE FROM postings WHERE doc_id < ?", (first_kept,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if removed:
+            self._release_free_pages()
+        return removed
+
+    def _release_free_pages(self) -> None:
+        free_pages = None
+        while True:
+            with self._lock:
+                remaining = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if remaining == 0 or remaining == free_pages:
+                    return
+                free_pages = remaining
+                self.conn.execute(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})").fetchall()
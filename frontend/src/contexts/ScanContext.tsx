@@ -46,6 +46,7 @@ export interface ScanSettings {
   min_priority_to_expand: ScanSettingsRange;
   include_subdomains: boolean;
   requests_per_minute: ScanSettingsRange;
+  max_requests_per_minute?: number;
   request_timeout_seconds: ScanSettingsRange;
   models?: {
     efficiency: ScanModel;
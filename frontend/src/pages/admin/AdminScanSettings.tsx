@@ -36,6 +36,7 @@ const cloneSettings = (settings: ScanSettings): ScanSettings => ({
   min_priority_to_expand: cloneRange(settings.min_priority_to_expand),
   include_subdomains: settings.include_subdomains,
   requests_per_minute: cloneRange(settings.requests_per_minute),
+  max_requests_per_minute: settings.max_requests_per_minute,
   request_timeout_seconds: cloneRange(settings.request_timeout_seconds),
   models: settings.models ? {
     efficiency: { ...settings.models.efficiency },